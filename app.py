@@ -12,35 +12,128 @@ import platform
 from datetime import datetime
 import wikipedia
 import re
-from googlesearch import search
 import threading
+import queue
+from collections import deque
+from contextlib import contextmanager
 import time
 import logging
+import logging.handlers
+import argparse
 from config import Config
+from cache import BoundedMemo
+from audio_processing import AudioPreprocessor
+from rooms import CapturePipeline, PhraseArbiter
+from audio_devices import AudioDeviceManager
+from config_watcher import ConfigWatcher
+from command_planner import CommandPlanner, PlannedCommand
+from quick_answer import QuickAnswerService
+from memory_monitor import MemoryMonitor
+from knowledge_index import KnowledgeIndex
+from prefetch import Prefetcher, UsageHistory
+from profiler import SamplingProfiler
+import streaming
+from streaming import EarlyCommit, PartialIntentTracker, VoskDecoder
+
+# Settings whose change requires rebuilding a live component
+TTS_SETTINGS = ('TTS_RATE', 'TTS_VOLUME', 'TTS_VOICE_PREFERENCE')
+SPOTIFY_SETTINGS = ('SPOTIFY_CLIENT_ID', 'SPOTIFY_CLIENT_SECRET', 'SPOTIFY_REDIRECT_URI', 'SPOTIFY_SCOPE')
+AUDIO_PREPROCESSOR_SETTINGS = ('AUDIO_PREPROCESSING', 'AUDIO_TARGET_SAMPLE_RATE')
+QUICK_ANSWER_SETTINGS = ('QUICK_ANSWER_WORKERS', 'QUICK_ANSWER_MAX_PENDING',
+                         'QUICK_ANSWER_CACHE_SIZE', 'QUICK_ANSWER_CACHE_TTL')
+ANSWER_CACHE_TTLS = {
+    'weather': 'WEATHER_CACHE_TTL',
+    'wikipedia': 'WIKIPEDIA_CACHE_TTL',
+    'play_spotify': 'SPOTIFY_SEARCH_CACHE_TTL',
+}
+# Settings only read while the assistant starts up
+RESTART_SETTINGS = (
+    'ROOMS', 'ROOM_QUEUE_SIZE', 'AMBIENT_NOISE_DURATION', 'GREETING_MESSAGE',
+    'LOG_FILE', 'LOG_LEVEL', 'LOG_MAX_BYTES', 'LOG_BACKUP_COUNT',
+    'STREAMING_RECOGNITION', 'STREAMING_MODEL', 'COMMAND_MAX_PARALLEL', 'KNOWLEDGE_INDEX',
+    'USAGE_HISTORY', 'USAGE_HISTORY_FILE', 'PREFETCH',
+    'CONFIG_FILE', 'CONFIG_RELOAD', 'CONFIG_RELOAD_INTERVAL',
+    'DAEMON_MODE', 'TRACEMALLOC', 'TRACEMALLOC_FRAMES', 'MEMORY_REPORT_PORT',
+    'PROFILE', 'PROFILE_SAMPLE_RATE', 'PROFILE_DIR',
+)
 
 class AdvancedVoiceAssistant:
     def __init__(self):
         """Initialize the Advanced Voice Assistant"""
         self.setup_logging()
         self.logger = logging.getLogger(__name__)
+        self.startup_metrics = {}
+        startup_started = time.perf_counter()
+        self.setup_profiler()
         
         # Print configuration status
         Config.print_config_status()
         Config.validate_config()
         
         # Initialize components
+        self.setup_intents()
+        self.setup_command_planner()
+        self.setup_http()
         self.setup_speech_recognition()
-        self.setup_text_to_speech()
-        self.setup_spotify()
+        self.setup_streaming()
+        with self.timed('tts'):
+            self.setup_text_to_speech()
+        with self.timed('spotify'):
+            self.setup_spotify()
+        self.setup_quick_answers()
+        self.setup_knowledge_index()
+        self.setup_prefetch()
+        self.setup_config_reload()
+        self.setup_daemon_mode()
         
         # State management
         self.is_listening = False
         self.last_command_time = time.time()
         
         # Initialize assistant
+        self.startup_metrics['total'] = (time.perf_counter() - startup_started) * 1000
         self.logger.info("Voice Assistant initialized successfully!")
+        self.logger.info("⏱️ Startup: " + ", ".join(
+            f"{phase} {elapsed:.0f} ms" for phase, elapsed in self.startup_metrics.items()
+        ))
         self.speak(Config.GREETING_MESSAGE)
     
+    @contextmanager
+    def timed(self, phase):
+        """Record how long a startup phase takes in startup_metrics (milliseconds)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_metrics[phase] = (time.perf_counter() - started) * 1000
+    
+    @contextmanager
+    def profiled_turn(self, text):
+        """Attribute profiler samples to one voice turn, from the wake word acknowledgement to the reply
+        
+        Latency is only measured from label_turn(), when the command has been captured.
+        """
+        if not self.profiler:
+            yield
+            return
+        self.profiler.begin_turn(text)
+        try:
+            yield
+        finally:
+            self.profiler.end_turn()
+    
+    def label_turn(self, text):
+        """Name the profiled turn after its command, which also starts its latency clock"""
+        if self.profiler:
+            self.profiler.label_turn(text)
+    
+    def setup_profiler(self):
+        """Sample all threads in the background when running with --profile"""
+        self.profiler = None
+        if Config.PROFILE:
+            self.profiler = SamplingProfiler()
+            self.profiler.start()
+    
     def setup_logging(self):
         """Setup logging configuration"""
         log_level = getattr(logging, Config.LOG_LEVEL.upper())
@@ -48,39 +141,160 @@ class AdvancedVoiceAssistant:
             level=log_level,
             format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             handlers=[
-                logging.FileHandler(Config.LOG_FILE),
+                logging.handlers.RotatingFileHandler(
+                    Config.LOG_FILE,
+                    maxBytes=Config.LOG_MAX_BYTES,
+                    backupCount=Config.LOG_BACKUP_COUNT
+                ),
                 logging.StreamHandler(sys.stdout)
             ]
         )
     
+    def setup_intents(self):
+        """Build the intent matchers and wake words derived from the config"""
+        self.intent_matchers = self.build_intent_matchers(Config.COMMAND_PATTERNS)
+        self.wake_words = self.build_wake_words(Config.WAKE_WORDS)
+        self.early_commit_phrases = self.build_early_commit_phrases(Config.EARLY_COMMIT_PHRASES)
+    
+    @staticmethod
+    def build_intent_matchers(command_patterns):
+        """Compile COMMAND_PATTERNS once instead of on every command"""
+        return [
+            (intent, [re.compile(pattern, re.IGNORECASE) for pattern in patterns])
+            for intent, patterns in command_patterns.items()
+        ]
+    
+    @staticmethod
+    def build_wake_words(wake_words):
+        """Normalize wake words for matching"""
+        return tuple(wake_word.lower() for wake_word in wake_words)
+    
+    @staticmethod
+    def build_early_commit_phrases(phrases):
+        """Compile EARLY_COMMIT_PHRASES once instead of on every phrase"""
+        return [re.compile(phrase, re.IGNORECASE) for phrase in phrases]
+    
+    def setup_command_planner(self):
+        """Create the planner that splits and runs compound commands"""
+        self.speech_capture = threading.local()
+        self.planner = CommandPlanner(self.extract_intent_and_entity, self.execute_captured)
+    
+    def setup_http(self):
+        """Create the HTTP session shared by every integration and room"""
+        self.http = requests.Session()
+    
     def setup_speech_recognition(self):
         """Initialize speech recognition"""
         self.recognizer = sr.Recognizer()
+        self.audio_preprocessor = AudioPreprocessor() if Config.AUDIO_PREPROCESSING else None
+        self.audio_devices = AudioDeviceManager()
+        self.rooms = {}
         
-        # Try to find the Microphone Array
-        microphone_index = None
-        for index, name in enumerate(sr.Microphone.list_microphone_names()):
-            if "Microphone Array" in name:
-                microphone_index = index
-                break
+        if Config.ROOMS:
+            self.setup_rooms()
+            return
         
-        # Use Microphone Array if found, otherwise use default
-        if microphone_index is not None:
-            print(f"🎤 Using Microphone Array (index {microphone_index})...")
-            self.microphone = sr.Microphone(device_index=microphone_index)
-        else:
-            print("🎤 Using default microphone...")
-            self.microphone = sr.Microphone()
+        # Use the first device matching MICROPHONE_PREFERENCES, otherwise the default
+        with self.timed('device_selection'):
+            self.microphone, self.microphone_name = self.audio_devices.open(Config.MICROPHONE_PREFERENCES)
+        print(f"🎤 Using {self.microphone_name}...")
         
         # Adjust for ambient noise
-        with self.microphone as source:
-            print("🎤 Calibrating microphone for ambient noise...")
-            self.recognizer.adjust_for_ambient_noise(source, duration=Config.AMBIENT_NOISE_DURATION)
+        with self.timed('microphone_calibration'):
+            with self.microphone as source:
+                print("🎤 Calibrating microphone for ambient noise...")
+                self.recognizer.adjust_for_ambient_noise(source, duration=Config.AMBIENT_NOISE_DURATION)
         print("✅ Microphone calibrated!")
     
+    def setup_streaming(self):
+        """Use the local incremental decoder for commands when it is installed"""
+        self.decoder_factory = None
+        self.early_commit = None
+        if not Config.STREAMING_RECOGNITION or Config.ROOMS or not streaming.available():
+            return
+        try:
+            with self.timed('streaming_model'):
+                streaming.load_model(Config.STREAMING_MODEL)
+            self.decoder_factory = VoskDecoder
+            print("⚡ Streaming recognition on: simple commands start before you finish speaking")
+        except Exception as e:
+            self.logger.error(f"❌ Streaming recognition unavailable: {e}")
+    
+    def switch_microphone(self, microphone, name):
+        """Move to another input device, keeping the current noise calibration"""
+        self.microphone, self.microphone_name = microphone, name
+        print(f"🔄 Switched to {name}")
+        self.logger.info(f"Switched microphone to {name}, "
+                         f"energy threshold kept at {self.recognizer.energy_threshold:.0f}")
+    
+    def check_audio_devices(self):
+        """Pick up hot-plugged devices between turns"""
+        try:
+            current_index = getattr(self.microphone, 'device_index', None)
+            replacement = self.audio_devices.poll(Config.MICROPHONE_PREFERENCES, current_index)
+        except Exception as e:
+            self.logger.error(f"Audio device check failed: {e}")
+            return
+        if replacement:
+            self.switch_microphone(*replacement)
+    
+    def recover_microphone(self):
+        """Reopen on a replacement device after the current one failed"""
+        try:
+            self.switch_microphone(*self.audio_devices.recover(Config.MICROPHONE_PREFERENCES))
+        except Exception as e:
+            self.logger.error(f"No usable microphone: {e}")
+    
+    def setup_rooms(self):
+        """Create one capture pipeline per configured room, feeding a single recognizer"""
+        self.capture_queue = queue.Queue(maxsize=Config.ROOM_QUEUE_SIZE)
+        self.room_queue = queue.Queue(maxsize=Config.ROOM_QUEUE_SIZE)
+        self.arbiter = PhraseArbiter(
+            self.capture_queue,
+            self.room_queue,
+            recognize=self.recognizer.recognize_google,
+            preprocessor=self.audio_preprocessor
+        )
+        
+        for room, device_name in Config.ROOMS.items():
+            with self.timed(f'device_selection.{room}'):
+                device_index = self.audio_devices.find(device_name)
+            if device_index is None:
+                self.logger.warning(f"⚠️ No input device matching '{device_name}' for room '{room}'")
+                continue
+            
+            print(f"🎤 Room '{room}' using {self.audio_devices.names()[device_index]} (index {device_index})...")
+            pipeline = CapturePipeline(
+                room,
+                sr.Microphone(device_index=device_index),
+                self.capture_queue,
+                echo_guard=self.is_clear_of_speech,
+                reopen=self.reopen_room_microphone
+            )
+            with self.timed(f'microphone_calibration.{room}'):
+                pipeline.calibrate()
+            self.rooms[room] = pipeline
+        
+        if not self.rooms:
+            raise RuntimeError("None of the configured room microphones were found")
+        print(f"✅ {len(self.rooms)} room(s) calibrated!")
+    
+    def reopen_room_microphone(self, room):
+        """Reopen a room's device after an error; None while it is unplugged"""
+        self.audio_devices.refresh()
+        device_index = self.audio_devices.find(Config.ROOMS[room])
+        return None if device_index is None else sr.Microphone(device_index=device_index)
+    
     def setup_text_to_speech(self):
         """Configure text-to-speech engine"""
         self.tts_engine = pyttsx3.init()
+        self.tts_busy = threading.Event()
+        self.tts_finished_at = 0.0
+        self.configure_tts()
+    
+    def configure_tts(self):
+        """Apply the TTS voice settings to the engine"""
+        self.tts_settings_stale = False
         
         # Configure voice properties
         self.tts_engine.setProperty('rate', Config.TTS_RATE)
@@ -106,7 +320,7 @@ class AdvancedVoiceAssistant:
                     scope=Config.SPOTIFY_SCOPE,
                     cache_path=".cache"
                 )
-                self.spotify = spotipy.Spotify(auth_manager=auth_manager)
+                self.spotify = spotipy.Spotify(auth_manager=auth_manager, requests_session=self.http)
                 self.logger.info("✅ Spotify connected successfully!")
             else:
                 self.spotify = None
@@ -115,31 +329,219 @@ class AdvancedVoiceAssistant:
             self.logger.error(f"❌ Spotify setup failed: {e}")
             self.spotify = None
     
+    def setup_quick_answers(self):
+        """Start the background lookup that follows up Google searches"""
+        # Rebuilt on config changes; answers still waiting to be spoken are kept
+        self.follow_ups = deque(getattr(self, 'follow_ups', ()), maxlen=Config.QUICK_ANSWER_MAX_PENDING)
+        self.quick_answers = QuickAnswerService(self.http, self.offer_quick_answer)
+    
+    def offer_quick_answer(self, query, snippet):
+        """Called from a worker thread; the main loop speaks it when idle"""
+        self.follow_ups.append((query, snippet, time.monotonic()))
+    
+    def speak_follow_ups(self):
+        """Speak quick answers that arrived since the last turn"""
+        while self.follow_ups:
+            query, snippet, arrived_at = self.follow_ups.popleft()
+            if time.monotonic() - arrived_at <= Config.QUICK_ANSWER_MAX_AGE:
+                self.speak(Config.RESPONSES['quick_answer'].format(query=query, snippet=snippet))
+    
+    def setup_knowledge_index(self):
+        """Open the offline knowledge index if one has been built"""
+        self.knowledge = None
+        if not os.path.exists(Config.KNOWLEDGE_INDEX):
+            return
+        try:
+            self.knowledge = KnowledgeIndex(Config.KNOWLEDGE_INDEX)
+            self.logger.info(f"📚 Offline knowledge index loaded from {Config.KNOWLEDGE_INDEX}")
+        except Exception as e:
+            self.logger.error(f"❌ Knowledge index unavailable: {e}")
+    
+    def setup_prefetch(self):
+        """Cache network answers and warm them ahead of requests made at the same time every day"""
+        self.usage = None
+        if Config.USAGE_HISTORY:
+            try:
+                self.usage = UsageHistory(Config.USAGE_HISTORY_FILE)
+            except Exception as e:
+                self.logger.error(f"❌ Usage history unavailable: {e}")
+        
+        fetchers = {
+            'weather': self.fetch_weather,
+            'wikipedia': self.fetch_wikipedia_summary,
+            'play_spotify': self.find_spotify_track,
+        }
+        self.prefetcher = Prefetcher({
+            intent: (fetch, getattr(Config, ANSWER_CACHE_TTLS[intent])) for intent, fetch in fetchers.items()
+        }, self.usage)
+        if Config.PREFETCH and self.usage:
+            self.prefetcher.start()
+    
+    def record_usage(self, intent, entity):
+        """Remember what was asked for at this time of day"""
+        if not self.usage or intent == "unknown":
+            return
+        try:
+            self.usage.record(intent, entity)
+        except Exception as e:
+            self.logger.error(f"Usage history error: {e}")
+    
+    def setup_config_reload(self):
+        """Watch the config file so settings can change without a restart"""
+        self.config_watcher = None
+        if Config.CONFIG_RELOAD:
+            self.config_watcher = ConfigWatcher(self.apply_config_changes)
+            self.config_watcher.start()
+            self.logger.info(f"Watching {Config.CONFIG_FILE} for configuration changes")
+    
+    def setup_daemon_mode(self):
+        """Track memory and trim unbounded third-party caches for long runs"""
+        self.memory_monitor = None
+        if not Config.DAEMON_MODE:
+            return
+        
+        monitor = MemoryMonitor()
+        monitor.track('follow_ups', lambda: len(self.follow_ups), self.follow_ups.maxlen)
+        monitor.track('quick_answer_cache', lambda: len(self.quick_answers.cache),
+                      self.quick_answers.cache.max_entries)
+        for intent, cache in self.prefetcher.caches.items():
+            monitor.track(f'{intent}_cache', lambda cache=cache: len(cache), cache.max_entries)
+        if self.rooms:
+            monitor.track('capture_queue', self.capture_queue.qsize, self.capture_queue.maxsize)
+            monitor.track('room_queue', self.room_queue.qsize, self.room_queue.maxsize)
+        self.bound_wikipedia_cache()
+        for name in ('summary', 'search'):
+            memo = getattr(wikipedia, name)
+            monitor.track(f'wikipedia.{name}', lambda memo=memo: len(memo), Config.WIKIPEDIA_CACHE_MAX)
+        monitor.start()
+        self.memory_monitor = monitor
+        print("🛡️ Daemon mode: memory is bounded and reports are available on demand")
+    
+    def bound_wikipedia_cache(self):
+        """The wikipedia library memoizes every lookup forever; cap each memo at WIKIPEDIA_CACHE_MAX"""
+        # summary() calls search() through the inner module, so that name is replaced too
+        modules = [wikipedia, getattr(wikipedia, 'wikipedia', None)]
+        for name in ('summary', 'search'):
+            memo = getattr(wikipedia, name)
+            if isinstance(memo, BoundedMemo):
+                memo.resize(Config.WIKIPEDIA_CACHE_MAX)
+                continue
+            bounded = BoundedMemo(memo.fn, Config.WIKIPEDIA_CACHE_MAX, memo._cache)
+            for module in modules:
+                if getattr(module, name, None) is memo:
+                    setattr(module, name, bounded)
+    
+    def apply_config_changes(self, changes):
+        """Rebuild only the state derived from changed settings, then swap it in"""
+        for name in RESTART_SETTINGS:
+            if name in changes:
+                del changes[name]
+                self.logger.warning(f"⚠️ {name} changed; restart the assistant to apply it")
+        
+        # Build everything before touching live state so a bad value (for
+        # example an invalid regex) leaves the running assistant unchanged
+        rebuilt = {}
+        if 'COMMAND_PATTERNS' in changes:
+            rebuilt['intent_matchers'] = self.build_intent_matchers(changes['COMMAND_PATTERNS'])
+        if 'WAKE_WORDS' in changes:
+            rebuilt['wake_words'] = self.build_wake_words(changes['WAKE_WORDS'])
+        if 'EARLY_COMMIT_PHRASES' in changes:
+            rebuilt['early_commit_phrases'] = self.build_early_commit_phrases(changes['EARLY_COMMIT_PHRASES'])
+        if any(name in changes for name in AUDIO_PREPROCESSOR_SETTINGS):
+            enabled = changes.get('AUDIO_PREPROCESSING', Config.AUDIO_PREPROCESSING)
+            rate = changes.get('AUDIO_TARGET_SAMPLE_RATE', Config.AUDIO_TARGET_SAMPLE_RATE)
+            rebuilt['audio_preprocessor'] = AudioPreprocessor(target_rate=rate) if enabled else None
+        
+        Config.apply(changes)
+        
+        # Turns already in flight keep the references they started with
+        for name, value in rebuilt.items():
+            setattr(self, name, value)
+        if self.rooms:
+            self.arbiter.preprocessor = self.audio_preprocessor
+        
+        if any(name in changes for name in TTS_SETTINGS):
+            # pyttsx3 is not thread-safe; speak() applies this before the next utterance
+            self.tts_settings_stale = True
+        if any(name in changes for name in SPOTIFY_SETTINGS):
+            self.setup_spotify()
+        if any(name in changes for name in QUICK_ANSWER_SETTINGS):
+            # Lookups already running finish on the old service
+            previous = self.quick_answers
+            self.setup_quick_answers()
+            previous.shutdown()
+        if any(name in changes for name in ('ANSWER_CACHE_SIZE', *ANSWER_CACHE_TTLS.values())):
+            self.prefetcher.configure_caches(
+                {intent: getattr(Config, name) for intent, name in ANSWER_CACHE_TTLS.items()}
+            )
+        if 'WIKIPEDIA_CACHE_MAX' in changes and self.memory_monitor:
+            self.bound_wikipedia_cache()
+        if 'MICROPHONE_PREFERENCES' in changes and not self.rooms:
+            index, _ = self.audio_devices.select(Config.MICROPHONE_PREFERENCES)
+            if index != getattr(self.microphone, 'device_index', None):
+                self.switch_microphone(*self.audio_devices.open(Config.MICROPHONE_PREFERENCES))
+    
     def speak(self, text):
         """Convert text to speech with improved error handling"""
+        captured = getattr(self.speech_capture, 'lines', None)
+        if captured is not None:
+            # Part of a compound command: spoken later, in the order it was asked
+            captured.append(text)
+            return
+        
         try:
             print(f"🤖 {Config.ASSISTANT_NAME}: {text}")
+            if self.tts_settings_stale:
+                self.configure_tts()
+            self.tts_busy.set()
             self.tts_engine.say(text)
             self.tts_engine.runAndWait()
         except Exception as e:
             self.logger.error(f"TTS Error: {e}")
             print(f"🤖 {Config.ASSISTANT_NAME}: {text}")  # Fallback to text only
+        finally:
+            self.tts_finished_at = time.monotonic()
+            self.tts_busy.clear()
+    
+    def is_clear_of_speech(self, started_at):
+        """True if a capture that began at started_at cannot contain our own speech"""
+        return not self.tts_busy.is_set() and started_at >= self.tts_finished_at
     
-    def listen(self, timeout=None):
+    def listen(self, timeout=None, stream=False):
         """Enhanced listening with better error handling"""
+        self.check_audio_devices()
         try:
+            local_text = None
             with self.microphone as source:
                 print("🎧 Listening...")
                 # Adjust the microphone for ambient noise before each listen
                 self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                audio = self.recognizer.listen(
-                    source, 
-                    timeout=timeout or Config.SPEECH_TIMEOUT,
-                    phrase_time_limit=Config.PHRASE_TIME_LIMIT
-                )
+                if stream:
+                    audio, local_text = self.listen_streaming(source, timeout)
+                else:
+                    audio = self.recognizer.listen(
+                        source, 
+                        timeout=timeout or Config.SPEECH_TIMEOUT,
+                        phrase_time_limit=Config.PHRASE_TIME_LIMIT
+                    )
             
-            # Recognize speech using Google Speech Recognition
-            text = self.recognizer.recognize_google(audio).lower()
+            if local_text is not None and Config.STREAMING_FINAL == 'local':
+                text = local_text
+                if not text:
+                    raise sr.UnknownValueError()
+            else:
+                # Shrink the upload to 16 kHz mono before recognition
+                if self.audio_preprocessor:
+                    audio = self.audio_preprocessor.process(audio)
+                
+                # Recognize speech using Google Speech Recognition
+                try:
+                    text = self.recognizer.recognize_google(audio).lower()
+                except (sr.UnknownValueError, sr.RequestError):
+                    # The local transcript is better than nothing when Google can't help
+                    if not local_text:
+                        raise
+                    text = local_text
             print(f"👤 You said: {text}")
             self.logger.info(f"Speech recognized: {text}")
             return text
@@ -154,19 +556,118 @@ class AdvancedVoiceAssistant:
             print(f"🌐 Network error: {e}")
             self.logger.error(f"Speech recognition error: {e}")
             return "network_error"
+        except OSError as e:
+            # PortAudio errors: usually the device was unplugged
+            print(f"❌ Microphone error: {e}")
+            self.logger.error(f"Listening error: {e}")
+            self.recover_microphone()
+            return "error"
         except Exception as e:
             print(f"❌ Error: {e}")
             self.logger.error(f"Listening error: {e}")
             return "error"
     
+    def listen_streaming(self, source, timeout):
+        """Capture a phrase while decoding it locally; returns (audio, local transcript)
+        
+        A stable partial result that is one of EARLY_COMMIT_PHRASES is started right
+        away with its speech held back; process_command() keeps or undoes it
+        once the final transcript is known.
+        """
+        decoder = self.decoder_factory(source.SAMPLE_RATE)
+        tracker = PartialIntentTracker(self.extract_intent_and_entity, self.early_commit_phrases)
+        frames, heard = [], 0.0
+        chunks = self.recognizer.listen(
+            source,
+            timeout=timeout or Config.SPEECH_TIMEOUT,
+            phrase_time_limit=Config.PHRASE_TIME_LIMIT,
+            stream=True
+        )
+        for chunk in chunks:
+            frames.append(chunk.frame_data)
+            heard += len(chunk.frame_data) / (source.SAMPLE_RATE * source.SAMPLE_WIDTH)
+            partial = decoder.accept(chunk.frame_data)
+            committed = tracker.update(partial, heard)
+            if committed:
+                command = PlannedCommand(partial, *committed)
+                print(f"⚡ Acting early on '{partial}': {command.intent}")
+                self.early_commit = EarlyCommit(
+                    command, self.planner.executor.submit(self.execute_early, command)
+                )
+        
+        audio = sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+        return audio, decoder.final().lower()
+    
+    def execute_early(self, command):
+        """Run a command from a partial result, first noting whether music was playing"""
+        was_playing = None
+        if Config.EARLY_COMMIT_INTENTS[command.intent] == 'resume':
+            was_playing = self.spotify_is_playing()
+        return (was_playing, *self.execute_captured(command))
+    
+    def spotify_is_playing(self):
+        """True if Spotify reports playback, None when that can't be told"""
+        if not self.spotify:
+            return None
+        try:
+            playback = self.spotify.current_playback()
+        except Exception as e:
+            self.logger.error(f"Spotify playback state error: {e}")
+            return None
+        return bool(playback and playback.get('is_playing'))
+    
+    def listen_for_command(self, timeout=None):
+        """Listen for a command, streaming it through the local decoder when available"""
+        if not self.decoder_factory:
+            return self.listen(timeout)
+        
+        text = self.listen(timeout, stream=True)
+        if text in ["timeout", "unknown", "network_error", "error"] and self.early_commit:
+            # No transcript to confirm what was started early, so take it back
+            early, self.early_commit = self.early_commit, None
+            self.roll_back_early_commit(early)
+        return text
+    
+    def settle_early_commit(self, early, commands):
+        """Keep an early command the final transcript agrees with and undo it otherwise
+        
+        Returns the commands that still need to run.
+        """
+        _, keep_running, lines = early.future.result()
+        for index, command in enumerate(commands):
+            if (command.intent, command.entity) == (early.command.intent, early.command.entity):
+                print(f"✅ Final transcript confirms early '{command.intent}'")
+                for line in lines:
+                    self.speak(line)
+                return commands[:index] + commands[index + 1:]
+        
+        print(f"↩️ Final transcript disagrees, undoing early '{early.command.intent}'")
+        self.logger.info(f"Rolled back early '{early.command.intent}' from partial '{early.command.text}'")
+        self.roll_back_early_commit(early)
+        return commands
+    
+    def roll_back_early_commit(self, early):
+        """Silently undo a command that was started from a partial result"""
+        was_playing, _, _ = early.future.result()
+        undo = Config.EARLY_COMMIT_INTENTS[early.command.intent]
+        if undo == 'resume' and not was_playing:
+            # Resuming would start music the user never had on
+            self.logger.info(f"Nothing was playing before the early '{early.command.intent}', not resuming")
+            return
+        self.speech_capture.lines = []
+        try:
+            self.control_spotify_playback(undo)
+        finally:
+            self.speech_capture.lines = None
+    
     def extract_intent_and_entity(self, text):
         """Enhanced NLP for command recognition"""
         text = text.lower().strip()
         print(f"🔍 Analyzing command: '{text}'")
         
-        for intent, patterns in Config.COMMAND_PATTERNS.items():
+        for intent, patterns in self.intent_matchers:
             for pattern in patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
+                match = pattern.search(text)
                 if match:
                     entities = match.groups() if match.groups() else []
                     entity = entities[0] if entities else None
@@ -196,12 +697,11 @@ class AdvancedVoiceAssistant:
         
         try:
             # Search for tracks, albums, or artists
-            results = self.spotify.search(q=query, type='track,album,artist', limit=5)
+            track = self.prefetcher.fetch('play_spotify', query)
             
-            if results['tracks']['items']:
-                track = results['tracks']['items'][0]
+            if track:
                 track_name = track['name']
-                artist_name = track['artists'][0]['name']
+                artist_name = track['artist']
                 track_uri = track['uri']
                 
                 # Get available devices
@@ -232,6 +732,16 @@ class AdvancedVoiceAssistant:
             self.logger.error(f"Spotify error: {e}")
             self.speak("Sorry, there was an error with Spotify playback.")
     
+    def find_spotify_track(self, query):
+        """Name, artist and URI of the best track match for query, or None"""
+        if not self.spotify:
+            return None
+        results = self.spotify.search(q=query, type='track,album,artist', limit=5)
+        if not results['tracks']['items']:
+            return None
+        track = results['tracks']['items'][0]
+        return {'name': track['name'], 'artist': track['artists'][0]['name'], 'uri': track['uri']}
+    
     def control_spotify_playback(self, action):
         """Control Spotify playback (pause, resume, next, previous)"""
         if not self.spotify:
@@ -281,35 +791,37 @@ class AdvancedVoiceAssistant:
             response = Config.RESPONSES['google_search'].format(query=query)
             self.speak(response)
             
-            # Try to get quick answer
-            try:
-                search_results = list(search(query, num_results=1, stop=1))
-                if search_results:
-                    self.logger.info(f"Top result: {search_results[0]}")
-            except:
-                pass  # Ignore if search API fails
+            # Look for a quick answer in the background; it is offered when ready
+            if Config.QUICK_ANSWERS:
+                self.quick_answers.request(query)
                 
         except Exception as e:
             self.logger.error(f"Google search error: {e}")
             self.speak("Sorry, there was an error searching Google")
     
+    def fetch_weather(self, location=None):
+        """Current conditions from OpenWeatherMap, or None without an API key"""
+        if Config.OPENWEATHER_API_KEY == 'your_openweather_api_key':
+            return None
+        
+        url = f"http://api.openweathermap.org/data/2.5/weather"
+        params = {
+            'q': location or Config.DEFAULT_CITY,
+            'appid': Config.OPENWEATHER_API_KEY,
+            'units': Config.WEATHER_UNITS
+        }
+        response = self.http.get(url, params=params, timeout=Config.REQUEST_TIMEOUT)
+        return response.json()
+    
     def get_weather(self, location=None):
         """Enhanced weather information"""
+        requested = location
         if not location:
             location = Config.DEFAULT_CITY
         
         try:
-            if Config.OPENWEATHER_API_KEY != 'your_openweather_api_key':
-                url = f"http://api.openweathermap.org/data/2.5/weather"
-                params = {
-                    'q': location,
-                    'appid': Config.OPENWEATHER_API_KEY,
-                    'units': Config.WEATHER_UNITS
-                }
-                
-                response = requests.get(url, params=params, timeout=Config.REQUEST_TIMEOUT)
-                data = response.json()
-                
+            data = self.prefetcher.fetch('weather', requested)
+            if data is not None:
                 if data["cod"] == 200:
                     weather_desc = data["weather"][0]["description"]
                     temp = round(data["main"]["temp"])
@@ -351,17 +863,22 @@ class AdvancedVoiceAssistant:
     
     def search_wikipedia(self, query):
         """Enhanced Wikipedia search"""
+        # Answer from the offline index when possible; only misses go to the network
+        if self.knowledge:
+            try:
+                summary = self.knowledge.lookup(query)
+                if summary:
+                    self.speak(Config.RESPONSES['knowledge_info'].format(summary=summary))
+                    return
+            except Exception as e:
+                self.logger.error(f"Knowledge index error: {e}")
+        
         try:
-            summary = wikipedia.summary(query, sentences=2)
+            summary = self.prefetcher.fetch('wikipedia', query)
             response = Config.RESPONSES['wikipedia_info'].format(summary=summary)
             self.speak(response)
-        except wikipedia.exceptions.DisambiguationError as e:
-            try:
-                summary = wikipedia.summary(e.options[0], sentences=2)
-                response = Config.RESPONSES['wikipedia_info'].format(summary=summary)
-                self.speak(response)
-            except:
-                self.speak(f"I found multiple results for {query}. Please be more specific.")
+        except wikipedia.exceptions.DisambiguationError:
+            self.speak(f"I found multiple results for {query}. Please be more specific.")
         except wikipedia.exceptions.PageError:
             response = Config.RESPONSES['wikipedia_not_found'].format(query=query)
             self.speak(response)
@@ -369,6 +886,16 @@ class AdvancedVoiceAssistant:
             self.logger.error(f"Wikipedia error: {e}")
             self.speak("Sorry, there was an error searching Wikipedia")
     
+    def fetch_wikipedia_summary(self, query):
+        """Two-sentence summary of the article for query, or of its first meaning if ambiguous"""
+        try:
+            return wikipedia.summary(query, sentences=2)
+        except wikipedia.exceptions.DisambiguationError as e:
+            try:
+                return wikipedia.summary(e.options[0], sentences=2)
+            except Exception:
+                raise e
+    
     def open_application(self, app_name):
         """Open applications with cross-platform support"""
         try:
@@ -421,9 +948,42 @@ class AdvancedVoiceAssistant:
     def process_command(self, text):
         """Enhanced command processing with better intent recognition"""
         print(f"🔍 Processing command: '{text}'")
-        intent, entity = self.extract_intent_and_entity(text)
-        print(f"🎯 Detected intent: '{intent}', entity: '{entity}'")
+        if Config.COMPOUND_COMMANDS:
+            commands = self.planner.plan(text)
+        else:
+            commands = [PlannedCommand(text, *self.extract_intent_and_entity(text))]
+        
+        early, self.early_commit = self.early_commit, None
+        if early:
+            commands = self.settle_early_commit(early, commands)
+            if not commands:
+                return True
+        
+        if len(commands) == 1:
+            _, intent, entity = commands[0]
+            print(f"🎯 Detected intent: '{intent}', entity: '{entity}'")
+            return self.execute_intent(intent, entity, text)
         
+        print(f"🧩 Split into {len(commands)} commands: {', '.join(c.intent for c in commands)}")
+        continue_running = True
+        for keep_running, lines in self.planner.run(commands):
+            for line in lines:
+                self.speak(line)
+            continue_running = continue_running and keep_running
+        return continue_running
+    
+    def execute_captured(self, command):
+        """Run one part of a compound command, collecting what it would say"""
+        self.speech_capture.lines = []
+        try:
+            keep_running = self.execute_intent(command.intent, command.entity, command.text)
+            return keep_running, self.speech_capture.lines
+        finally:
+            self.speech_capture.lines = None
+    
+    def execute_intent(self, intent, entity, text):
+        """Carry out a single intent; returns False when the assistant should stop"""
+        self.record_usage(intent, entity)
         try:
             if intent == "play_spotify":
                 print("🎵 Attempting to play music on Spotify...")
@@ -499,8 +1059,6 @@ class AdvancedVoiceAssistant:
             self.speak(Config.RESPONSES['error_occurred'])
         
         return True
-        
-        return True
     
     def check_wake_word(self, text):
         """Check if any wake word is present"""
@@ -508,13 +1066,73 @@ class AdvancedVoiceAssistant:
             return False
         
         text = text.lower().strip()
-        for wake_word in Config.WAKE_WORDS:
-            if wake_word.lower() in text:
-                return True
-        return False
+        return any(wake_word in text for wake_word in self.wake_words)
+    
+    def wait_for_room_command(self, room, timeout):
+        """Return the next phrase heard in `room` after the assistant stopped speaking"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return "timeout"
+            try:
+                utterance = self.room_queue.get(timeout=remaining)
+            except queue.Empty:
+                return "timeout"
+            if utterance.room == room and utterance.captured_at >= self.tts_finished_at:
+                return utterance.text
+    
+    def run_multi_room(self):
+        """Main loop when several rooms share one assistant"""
+        print(f"🎤 {Config.ASSISTANT_NAME} is ready in {len(self.rooms)} rooms: {', '.join(self.rooms)}")
+        print(f"💬 Wake words: {', '.join(Config.WAKE_WORDS)}")
+        print("🔴 Press Ctrl+C to exit\n")
+        
+        for pipeline in self.rooms.values():
+            pipeline.start()
+        self.arbiter.start()
+        
+        try:
+            while True:
+                try:
+                    utterance = self.room_queue.get(timeout=Config.ROOM_LISTEN_TIMEOUT)
+                except queue.Empty:
+                    self.speak_follow_ups()
+                    continue
+                if not self.check_wake_word(utterance.text):
+                    continue
+                
+                # Several rooms may hear the same wake word; the arbiter only recognized the loudest
+                winner = utterance
+                print(f"✅ Wake word detected in {winner.room}!")
+                with self.profiled_turn(f"{winner.room} command"):
+                    self.speak(Config.RESPONSES['listening'])
+                    
+                    # The command comes from the room that answered, even if another hears it louder
+                    self.arbiter.focus = winner.room
+                    try:
+                        command = self.wait_for_room_command(winner.room, Config.ROOM_COMMAND_TIMEOUT)
+                    finally:
+                        self.arbiter.focus = None
+                    self.label_turn(command)
+                    if command != "timeout":
+                        print(f"🎯 Processing command from {winner.room}: {command}")
+                        if not self.process_command(command):
+                            break
+                    else:
+                        self.speak(Config.RESPONSES['not_understood'])
+        except KeyboardInterrupt:
+            self.speak(Config.GOODBYE_MESSAGE)
+        finally:
+            for pipeline in self.rooms.values():
+                pipeline.stop()
+            self.arbiter.stop()
     
     def run(self):
         """Main execution loop with improved error handling"""
+        if self.rooms:
+            return self.run_multi_room()
+        
         print(f"🎤 {Config.ASSISTANT_NAME} is ready!")
         print(f"💬 Wake words: {', '.join(Config.WAKE_WORDS)}")
         print("❗ Remember to say a wake word before each command!")
@@ -528,6 +1146,8 @@ class AdvancedVoiceAssistant:
         
         while True:
             try:
+                self.speak_follow_ups()
+                
                 # Listen for wake word
                 text = self.listen(timeout=1)  # Short timeout for wake word detection
                 
@@ -551,20 +1171,23 @@ class AdvancedVoiceAssistant:
                 if self.check_wake_word(text):
                     print("✅ Wake word detected!")
                     command_without_wake = 0  # Reset counter when wake word is used
-                    self.speak(Config.RESPONSES['listening'])
-                    
-                    # Listen for the actual command with longer timeout
-                    print("👂 Waiting for your command...")
-                    command = self.listen(timeout=10)
-                    
-                    if command not in ["timeout", "unknown", "network_error", "error"]:
-                        print(f"🎯 Processing command: {command}")
-                        continue_running = self.process_command(command)
-                        if not continue_running:
-                            break
-                    else:
-                        print(f"❌ Command not recognized: {command}")
-                        self.speak(Config.RESPONSES['not_understood'])
+                    # Capture and early commits made while listening are sampled with the turn;
+                    # its latency only counts from label_turn(), once the command is captured
+                    with self.profiled_turn("command"):
+                        self.speak(Config.RESPONSES['listening'])
+                        
+                        # Listen for the actual command with longer timeout
+                        print("👂 Waiting for your command...")
+                        command = self.listen_for_command(timeout=10)
+                        self.label_turn(command)
+                        
+                        if command not in ["timeout", "unknown", "network_error", "error"]:
+                            print(f"🎯 Processing command: {command}")
+                            if not self.process_command(command):
+                                break
+                        else:
+                            print(f"❌ Command not recognized: {command}")
+                            self.speak(Config.RESPONSES['not_understood'])
                 else:
                     print("❌ No wake word detected in:", text)
                     # If it seems like a command but no wake word was used
@@ -583,10 +1206,30 @@ class AdvancedVoiceAssistant:
                 self.logger.error(f"Main loop error: {e}")
                 time.sleep(1)  # Prevent rapid error loops
 
+def parse_args(argv=None):
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Advanced Voice Assistant")
+    parser.add_argument('--daemon', action='store_true',
+                        help="long-running mode with bounded memory and on-demand memory reports")
+    parser.add_argument('--profile', action='store_true',
+                        help="sample all threads and save flame graph stacks for slow turns")
+    return parser.parse_args(argv)
+
 def main():
     """Main function with startup checks"""
+    args = parse_args()
+    if args.daemon:
+        Config.DAEMON_MODE = True
+    if args.profile:
+        Config.PROFILE = True
+    
     print("🚀 Starting Advanced Voice Assistant...")
     
+    if Config.file_error:
+        print(f"❌ Could not apply {Config.CONFIG_FILE}: {Config.file_error}")
+        logging.error(f"Config file error: {Config.file_error}")
+        return
+    
     # Check Python version
     if sys.version_info < (3, 8):
         print("❌ Python 3.8 or higher is required!")
@@ -595,6 +1238,9 @@ def main():
     try:
         assistant = AdvancedVoiceAssistant()
         assistant.run()
+        assistant.logger.info(assistant.prefetcher.report())
+        if assistant.profiler:
+            assistant.profiler.stop()
     except KeyboardInterrupt:
         print("\n👋 Assistant stopped by user")
     except Exception as e:
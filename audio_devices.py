@@ -0,0 +1,108 @@
+import logging
+import threading
+import time
+
+import speech_recognition as sr
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class AudioDeviceManager:
+    """Enumerate input devices once and recover when the selected one disappears
+
+    Every sr.Microphone.list_microphone_names() call starts up a whole PortAudio
+    host, so the device list is cached and only re-read after a device error or
+    when AUDIO_DEVICE_POLL_INTERVAL has passed.
+    """
+
+    def __init__(self, list_names=None, open_device=None):
+        self._list_names = list_names or sr.Microphone.list_microphone_names
+        self._open_device = open_device or (lambda index: sr.Microphone(device_index=index))
+        self._names = None
+        self._lookups = {}
+        self._lock = threading.RLock()
+        self.last_refresh = 0.0
+        self.enumerations = 0
+
+    def names(self):
+        """Cached device names, indexed like PortAudio device indexes"""
+        with self._lock:
+            if self._names is None:
+                self._enumerate()
+            return list(self._names)
+
+    def refresh(self):
+        """Re-read the device list; returns (connected, disconnected) device names"""
+        with self._lock:
+            return self._enumerate()
+
+    def _enumerate(self):
+        started = time.perf_counter()
+        names = list(self._list_names())
+        self.enumerations += 1
+        self.last_refresh = time.monotonic()
+        logger.info(f"Enumerated {len(names)} audio devices in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        previous, self._names, self._lookups = self._names, names, {}
+        if previous is None:
+            return [], []
+
+        connected = [name for name in names if name not in previous]
+        disconnected = [name for name in previous if name not in names]
+        for name in connected:
+            logger.info(f"🔌 Audio device connected: {name}")
+        for name in disconnected:
+            logger.warning(f"🔌 Audio device disconnected: {name}")
+        return connected, disconnected
+
+    def find(self, fragment):
+        """Index of the first device whose name contains fragment, or None"""
+        with self._lock:
+            if self._names is None:
+                self._enumerate()
+            if fragment not in self._lookups:
+                self._lookups[fragment] = next(
+                    (index for index, name in enumerate(self._names) if fragment in name), None
+                )
+            return self._lookups[fragment]
+
+    def select(self, preferences):
+        """(index, name) of the most preferred device present; index None is the system default"""
+        with self._lock:
+            for fragment in preferences:
+                index = self.find(fragment)
+                if index is not None:
+                    return index, self._names[index]
+            return None, "default microphone"
+
+    def open(self, preferences):
+        """Open the most preferred device present; returns (microphone, name)"""
+        index, name = self.select(preferences)
+        return self._open_device(index), name
+
+    def recover(self, preferences):
+        """Re-enumerate after a device error and open the best device still present"""
+        self.refresh()
+        return self.open(preferences)
+
+    def poll(self, preferences, current_index):
+        """Look for hot-plug changes at most every AUDIO_DEVICE_POLL_INTERVAL seconds
+
+        current_index is the device_index the open microphone was created with.
+        PortAudio renumbers devices when one is plugged in, so the same index can
+        now name another device. Returns (microphone, name) when the most
+        preferred device is at a different index, otherwise None.
+        """
+        interval = Config.AUDIO_DEVICE_POLL_INTERVAL
+        if not interval or time.monotonic() - self.last_refresh < interval:
+            return None
+
+        connected, disconnected = self.refresh()
+        if not connected and not disconnected:
+            return None
+        best_index, best_name = self.select(preferences)
+        if best_index == current_index:
+            return None
+        return self._open_device(best_index), best_name
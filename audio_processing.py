@@ -0,0 +1,132 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+import speech_recognition as sr
+
+from config import Config
+
+
+def pcm_to_float(frame_data, sample_width, channels=1):
+    """Decode little-endian PCM bytes into a float32 array of shape (frames, channels)"""
+    if sample_width == 1:
+        samples = (np.frombuffer(frame_data, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(frame_data, dtype='<i2').astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        raw = np.frombuffer(frame_data, dtype=np.uint8).reshape(-1, 3)
+        ints = (raw[:, 0].astype(np.int32)
+                | (raw[:, 1].astype(np.int32) << 8)
+                | (raw[:, 2].astype(np.int32) << 16))
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        samples = ints.astype(np.float32) / 8388608.0
+    elif sample_width == 4:
+        samples = np.frombuffer(frame_data, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+
+    usable = len(samples) - (len(samples) % channels)
+    return samples[:usable].reshape(-1, channels)
+
+
+def float_to_pcm16(samples):
+    """Encode a float array in [-1, 1] as 16-bit little-endian PCM bytes"""
+    clipped = np.clip(samples, -1.0, 1.0)
+    return (clipped * 32767.0).astype('<i2').tobytes()
+
+
+def downmix(samples):
+    """Average all channels of a (frames, channels) array into a mono signal"""
+    if samples.shape[1] == 1:
+        return samples[:, 0]
+    return samples.mean(axis=1)
+
+
+@lru_cache(maxsize=16)
+def _polyphase_filter_bank(up, down, half_width):
+    """Build a windowed-sinc anti-alias filter split into `up` polyphase branches"""
+    # Cut off just below the lower of the two Nyquist frequencies (cycles per
+    # sample of the virtual upsampled stream)
+    cutoff = 0.475 / max(up, down)
+    taps_per_phase = 2 * half_width
+    n_taps = taps_per_phase * up
+
+    # Centre on a whole input sample so the delay is exactly half_width samples
+    t = np.arange(n_taps, dtype=np.float64) - half_width * up
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(n_taps, 8.0)
+    kernel *= up / kernel.sum()
+
+    # Branch p holds kernel[p], kernel[p + up], ... so each output sample is a
+    # short dot product over the original (not zero-stuffed) input
+    bank = kernel.reshape(taps_per_phase, up).T[:, ::-1]
+    return np.ascontiguousarray(bank, dtype=np.float32)
+
+
+def resample(signal, from_rate, to_rate, half_width=None):
+    """Resample a mono float signal with a polyphase anti-alias filter"""
+    if from_rate == to_rate or len(signal) == 0:
+        return signal.astype(np.float32, copy=False)
+
+    half_width = half_width or Config.AUDIO_RESAMPLE_HALF_WIDTH
+    divisor = math.gcd(int(from_rate), int(to_rate))
+    up, down = int(to_rate) // divisor, int(from_rate) // divisor
+    bank = _polyphase_filter_bank(up, down, half_width)
+    taps_per_phase = bank.shape[1]
+
+    n_out = (len(signal) * up) // down
+    positions = np.arange(n_out, dtype=np.int64) * down
+    base = positions // up
+    phase = positions % up
+
+    # Pad so that every window [base - half_width + 1, base + half_width] is in range
+    padded = np.pad(signal.astype(np.float32, copy=False), (taps_per_phase, taps_per_phase))
+    offsets = np.arange(taps_per_phase, dtype=np.int64) + (taps_per_phase - half_width + 1)
+
+    out = np.empty(n_out, dtype=np.float32)
+    block = Config.AUDIO_RESAMPLE_BLOCK
+    for start in range(0, n_out, block):
+        stop = min(start + block, n_out)
+        windows = padded[base[start:stop, None] + offsets[None, :]]
+        out[start:stop] = np.einsum('ij,ij->i', windows, bank[phase[start:stop]])
+    return out
+
+
+def rms_level(audio, channels=1):
+    """Root-mean-square level of an sr.AudioData as a fraction of full scale"""
+    samples = pcm_to_float(audio.frame_data, audio.sample_width, channels)
+    if samples.size == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+
+
+def normalize_gain(signal, target_peak=None, max_gain=None):
+    """Scale a signal so its peak sits at target_peak, never boosting more than max_gain"""
+    target_peak = Config.AUDIO_TARGET_PEAK if target_peak is None else target_peak
+    max_gain = Config.AUDIO_MAX_GAIN if max_gain is None else max_gain
+
+    peak = float(np.max(np.abs(signal))) if len(signal) else 0.0
+    if peak <= 0.0:
+        return signal
+    gain = min(target_peak / peak, max_gain)
+    return signal * gain
+
+
+class AudioPreprocessor:
+    """Convert captured audio to the compact format used for speech recognition"""
+
+    def __init__(self, target_rate=None, channels=1, normalize=True):
+        self.target_rate = target_rate or Config.AUDIO_TARGET_SAMPLE_RATE
+        self.channels = channels
+        self.normalize = normalize
+
+    def process(self, audio):
+        """Downmix, resample and normalize an sr.AudioData into 16-bit mono"""
+        samples = pcm_to_float(audio.frame_data, audio.sample_width, self.channels)
+        signal = downmix(samples)
+
+        target_rate = min(self.target_rate, audio.sample_rate)
+        signal = resample(signal, audio.sample_rate, target_rate)
+        if self.normalize:
+            signal = normalize_gain(signal)
+
+        return sr.AudioData(float_to_pcm16(signal), target_rate, 2)
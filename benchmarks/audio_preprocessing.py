@@ -0,0 +1,90 @@
+"""Compare ASR upload size and latency with and without audio preprocessing.
+
+Run from the project root:
+
+    python -m benchmarks.audio_preprocessing
+    python -m benchmarks.audio_preprocessing --wav sample.wav --recognize
+"""
+import argparse
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+from audio_processing import AudioPreprocessor
+
+
+def synthetic_speech(sample_rate, seconds=4.0, seed=0):
+    """Build a speech-like test signal: a gliding harmonic voice plus room noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    pitch = 120 + 40 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 20))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t) ** 2
+    signal = 0.2 * voice * envelope + 0.01 * rng.standard_normal(len(t))
+    pcm = (np.clip(signal, -1, 1) * 32767).astype('<i2').tobytes()
+    return sr.AudioData(pcm, sample_rate, 2)
+
+
+def load_wav(path):
+    """Read a WAV file into an sr.AudioData"""
+    with sr.AudioFile(path) as source:
+        return sr.Recognizer().record(source)
+
+
+def upload_size(audio):
+    """Bytes recognize_google would send for this audio"""
+    try:
+        return len(audio.get_flac_data(convert_width=2)), "flac"
+    except (OSError, AssertionError):
+        return len(audio.get_raw_data(convert_width=2)), "raw"
+
+
+def time_recognition(recognizer, audio, repeats):
+    """Median wall-clock seconds for recognize_google on this audio"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        try:
+            recognizer.recognize_google(audio)
+        except sr.UnknownValueError:
+            pass
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wav", help="recorded utterance to use instead of synthetic audio")
+    parser.add_argument("--rates", type=int, nargs="+", default=[44100, 48000],
+                        help="capture rates for synthetic audio")
+    parser.add_argument("--recognize", action="store_true",
+                        help="also time recognize_google (needs network)")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    samples = [load_wav(args.wav)] if args.wav else [synthetic_speech(rate) for rate in args.rates]
+    preprocessor = AudioPreprocessor()
+    recognizer = sr.Recognizer()
+
+    print(f"{'input':>12} {'bytes before':>13} {'bytes after':>12} {'ratio':>6} {'convert ms':>11}"
+          + (f" {'asr before s':>13} {'asr after s':>12}" if args.recognize else ""))
+    for audio in samples:
+        start = time.perf_counter()
+        processed = preprocessor.process(audio)
+        convert_ms = (time.perf_counter() - start) * 1000
+
+        before, fmt = upload_size(audio)
+        after, _ = upload_size(processed)
+        row = (f"{audio.sample_rate:>9} Hz {before:>13} {after:>12} "
+               f"{before / after:>6.2f} {convert_ms:>11.1f}")
+        if args.recognize:
+            row += (f" {time_recognition(recognizer, audio, args.repeats):>13.3f}"
+                    f" {time_recognition(recognizer, processed, args.repeats):>12.3f}")
+        print(row)
+    print(f"(upload sizes measured as {fmt})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""Synthetic stand-ins for devices and integrations used by the benchmarks"""
+import random
+import threading
+import time
+
+import numpy as np
+import speech_recognition as sr
+import wikipedia
+from wikipedia.util import cache as wikipedia_cache
+
+
+class SyntheticStream:
+    """PyAudio-like stream that plays a scripted timeline of noise and phrases"""
+
+    def __init__(self, microphone):
+        self.microphone = microphone
+        self.position = 0
+        self.started = microphone.epoch or time.monotonic()
+
+    def read(self, size):
+        mic = self.microphone
+        if mic.realtime_factor:
+            # Pace reads like a real device, scaled by realtime_factor
+            due = self.started + self.position / mic.SAMPLE_RATE / mic.realtime_factor
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        start, stop = self.position, self.position + size
+        self.position = stop
+        samples = mic.noise_level * mic.rng.standard_normal(size)
+        for phrase_start, phrase_stop, amplitude, text in mic.phrases:
+            if phrase_start < stop and phrase_stop > start:
+                lo, hi = max(start, phrase_start), min(stop, phrase_stop)
+                t = np.arange(lo, hi) / mic.SAMPLE_RATE
+                samples[lo - start:hi - start] += amplitude * np.sin(2 * np.pi * 180 * t)
+                mic.last_text = text
+        return (np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes()
+
+    def close(self):
+        pass
+
+
+class SyntheticMicrophone(sr.AudioSource):
+    """Drop-in for sr.Microphone that emits scripted phrases instead of device audio
+
+    `phrases` is a list of (start_seconds, duration_seconds, amplitude, text).
+    Microphones given the same `epoch` (a time.monotonic() value) play their
+    timelines in lockstep, like devices in different rooms hearing one speaker.
+    """
+
+    def __init__(self, phrases=(), sample_rate=16000, chunk_size=1024,
+                 noise_level=0.002, realtime_factor=None, seed=0, epoch=None):
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = chunk_size
+        self.noise_level = noise_level
+        self.realtime_factor = realtime_factor
+        self.epoch = epoch
+        self.rng = np.random.default_rng(seed)
+        self.phrases = [
+            (int(start * sample_rate), int((start + duration) * sample_rate), amplitude, text)
+            for start, duration, amplitude, text in phrases
+        ]
+        self.last_text = ""
+        self.stream = None
+        self._timeline = None
+
+    def __enter__(self):
+        # Re-entering continues the same timeline, like a device that kept running
+        if self._timeline is None:
+            self._timeline = SyntheticStream(self)
+        self.stream = self._timeline
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+
+class FakeRecognizer:
+    """Stands in for recognize_google: returns the phrase the microphone last played"""
+
+    def __init__(self, microphone, latency=(0.05, 0.15)):
+        self.microphone = microphone
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, audio, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(random.uniform(*self.latency))
+        if not self.microphone.last_text:
+            raise sr.UnknownValueError()
+        return self.microphone.last_text
+
+
+class FakeResponse:
+    def __init__(self, payload=None, text=""):
+        self.payload = payload
+        self.text = text
+        self.status_code = 200
+        self.encoding = "utf-8"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def json(self):
+        return self.payload
+
+    def iter_content(self, chunk_size=1):
+        content = self.text.encode(self.encoding)
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size]
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """Canned answers for the HTTP endpoints the assistant talks to"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        params = params or {}
+        if "openweathermap" in url:
+            return FakeResponse({
+                "cod": 200,
+                "weather": [{"description": "clear sky"}],
+                "main": {"temp": 21.4, "feels_like": 20.6},
+                "name": params.get("q"),
+            })
+        if "search" in url:
+            query = params.get("q", "")
+            return FakeResponse({"results": [{
+                "url": f"https://example.org/{query.replace(' ', '_')}",
+                "content": f"{query.capitalize()} is a frequently asked about topic. " * 3,
+            }]})
+        return FakeResponse(text="<html><p>Nothing here.</p></html>")
+
+    def mount(self, *args, **kwargs):
+        pass
+
+
+class FakeSpotify:
+    """Accepts every playback call and finds a track for every query"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.searches = 0
+        self.playing = True
+        self._lock = threading.Lock()
+
+    def search(self, q, type="track", limit=5, **kwargs):
+        with self._lock:
+            self.searches += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return {"tracks": {"items": [{
+            "name": q.title(), "artists": [{"name": "Replay Band"}], "uri": f"spotify:track:{abs(hash(q))}",
+        }]}}
+
+    def devices(self):
+        return {"devices": [{"id": "replay", "is_active": True}]}
+
+    def current_playback(self):
+        return {"is_playing": self.playing}
+
+    def start_playback(self, *args, **kwargs):
+        self.playing = True
+
+    def pause_playback(self, *args, **kwargs):
+        self.playing = False
+
+    def next_track(self, *args, **kwargs):
+        pass
+
+    def previous_track(self, *args, **kwargs):
+        pass
+
+
+class FakeTTSEngine:
+    """pyttsx3 engine that only remembers how much it was asked to say"""
+
+    def __init__(self):
+        self.utterances = 0
+        self.properties = {"voices": []}
+
+    def say(self, text):
+        self.utterances += 1
+
+    def runAndWait(self):
+        pass
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def getProperty(self, name):
+        return self.properties.get(name)
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.opened = 0
+
+    def open(self, url, *args, **kwargs):
+        self.opened += 1
+        return True
+
+
+class FakeWikipedia:
+    """Stands in for the wikipedia module, including its unbounded memo cache"""
+
+    exceptions = wikipedia.exceptions
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.lookups = 0
+        self.summary = wikipedia_cache(self._summary)
+        self.search = wikipedia_cache(lambda query, results=10, suggestion=False: [query])
+
+    def _summary(self, title, sentences=0, chars=0, auto_suggest=True, redirect=True):
+        self.lookups += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return f"{title.capitalize()} is a replayed encyclopedia entry. It has two sentences."
+
+
+def replay_assistant_class():
+    """AdvancedVoiceAssistant wired to scripted speech and the fakes above
+
+    Imported lazily so benchmarks that only need synthetic audio don't pull in
+    the whole assistant.
+    """
+    import app
+
+    class ReplayAssistant(app.AdvancedVoiceAssistant):
+        def __init__(self, utterances, http=None, spotify=None):
+            self.utterances = iter(utterances)
+            self.fake_http = http or FakeSession()
+            self.fake_spotify = spotify or FakeSpotify()
+            super().__init__()
+
+        def setup_logging(self):
+            pass  # the driver decides where logs go
+
+        def setup_http(self):
+            self.http = self.fake_http
+
+        def setup_speech_recognition(self):
+            self.recognizer = None
+            self.audio_preprocessor = None
+            self.rooms = {}
+
+        def setup_text_to_speech(self):
+            self.tts_engine = FakeTTSEngine()
+            self.tts_busy = threading.Event()
+            self.tts_finished_at = 0.0
+            self.configure_tts()
+
+        def setup_spotify(self):
+            self.spotify = self.fake_spotify
+
+        def listen(self, timeout=None):
+            # Once the script runs out, wake the assistant and say goodbye
+            text = next(self.utterances, None)
+            if text is None:
+                self.utterances = iter(["hey assistant", "goodbye"])
+                text = next(self.utterances)
+            return text
+
+    return ReplayAssistant
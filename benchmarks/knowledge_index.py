@@ -0,0 +1,93 @@
+"""Import throughput and query latency of the offline knowledge index.
+
+Builds an index of synthetic articles in a temporary directory, streaming
+the records so memory stays flat regardless of size. Run from the project root:
+
+    python -m benchmarks.knowledge_index --rows 2000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from knowledge_index import KnowledgeIndex, first_sentences
+
+SYLLABLES = ["ka", "lo", "mi", "ren", "tor", "vel", "sa", "qu", "dra", "phi", "nus", "ello",
+             "ber", "gan", "ost", "rio", "tam", "zu", "wen", "cho"]
+
+
+def word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+
+
+def synthetic_articles(rows, seed=0):
+    """Yield (title, abstract) pairs without holding them in memory"""
+    rng = random.Random(seed)
+    for number in range(rows):
+        title = f"{word(rng).capitalize()} {word(rng).capitalize()} {number}"
+        abstract = (f"{title} is a {word(rng)} {word(rng)} known for {word(rng)} and {word(rng)}. "
+                    f"It was first described in {1800 + number % 220}. "
+                    f"Later work connected it to {word(rng)} {word(rng)}.")
+        yield title, abstract
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def time_queries(index, queries):
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.lookup(query)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), percentile(timings, 0.99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=None)
+    parser.add_argument("--db", help="keep the index at this path instead of a temp file")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="knowledge-bench-"), "knowledge.db")
+    index = KnowledgeIndex(path)
+
+    started = time.perf_counter()
+    rows = index.import_records(synthetic_articles(args.rows), args.batch)
+    import_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    index.optimize()
+    optimize_seconds = time.perf_counter() - started
+    print(f"Imported {rows:,} rows in {import_seconds:.1f} s ({rows / import_seconds:,.0f} rows/s), "
+          f"optimize {optimize_seconds:.1f} s, {os.path.getsize(path) / 2**20:,.0f} MiB on disk")
+
+    started = time.perf_counter()
+    updated = index.import_records(synthetic_articles(min(args.rows, 100000)), args.batch)
+    print(f"Re-import of {updated:,} unchanged rows: {updated / (time.perf_counter() - started):,.0f} rows/s")
+
+    rng = random.Random(1)
+    titles = [title for title, _ in synthetic_articles(args.rows) if rng.random() < args.queries / args.rows]
+    scenarios = {
+        "exact title": titles,
+        "title words": [" ".join(title.split()[:2]).lower() for title in titles],
+        "miss": [f"unknown topic {n}" for n in range(len(titles))],
+    }
+    print(f"{'query':>12} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, queries in scenarios.items():
+        p50, p99 = time_queries(index, queries)
+        print(f"{name:>12} {p50:>8.3f} {p99:>8.3f}")
+
+    sample = index.search(scenarios["title words"][0], limit=1)
+    if sample:
+        print(f"Sample: {sample[0][0]}: {first_sentences(sample[0][1])}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
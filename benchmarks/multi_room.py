@@ -0,0 +1,119 @@
+"""Scaling benchmark for multi-room capture with synthetic microphones.
+
+Every room hears the same wake phrases at a different loudness; the benchmark
+checks that arbitration picks the loudest room and reports how decision latency,
+recognition uploads and CPU use grow with the number of rooms. The simulated
+recognition latency varies by more than the arbitration window, which must not
+change the outcome since rooms are compared before anything is uploaded. Run
+from the project root:
+
+    python -m benchmarks.multi_room --rooms 1 2 4 8 16
+"""
+import argparse
+import logging
+import queue
+import random
+import time
+
+from config import Config
+from audio_processing import AudioPreprocessor
+from rooms import CapturePipeline, PhraseArbiter
+from benchmarks.fakes import SyntheticMicrophone, FakeRecognizer
+
+
+def is_wake(text):
+    return any(wake_word in text for wake_word in Config.WAKE_WORDS)
+
+
+def run_scenario(room_count, events, period, speed, seed, latency):
+    rng = random.Random(seed)
+    first_phrase, duration = 1.5, 1.0
+    # amplitudes[event][room]; the loudest room is the one that should answer
+    amplitudes = [[rng.uniform(0.02, 0.4) for _ in range(room_count)] for _ in range(events)]
+
+    captures = queue.Queue(maxsize=Config.ROOM_QUEUE_SIZE)
+    utterances = queue.Queue(maxsize=Config.ROOM_QUEUE_SIZE)
+    epoch = time.monotonic()
+    pipelines, microphones = [], []
+    for room in range(room_count):
+        phrases = [
+            (first_phrase + event * period, duration, amplitudes[event][room], f"hey assistant {event}")
+            for event in range(events)
+        ]
+        microphone = SyntheticMicrophone(phrases, realtime_factor=speed, seed=seed + room,
+                                         epoch=epoch)
+        pipeline = CapturePipeline(f"room{room}", microphone, captures)
+        pipeline.calibrate(0.5)
+        pipelines.append(pipeline)
+        microphones.append(microphone)
+
+    # Rooms play in lockstep, so any microphone knows the phrase being spoken
+    recognizer = FakeRecognizer(microphones[0], latency=latency)
+    arbiter = PhraseArbiter(captures, utterances, recognize=recognizer, preprocessor=AudioPreprocessor())
+    cpu_start = time.process_time()
+    for pipeline in pipelines:
+        pipeline.start()
+    arbiter.start()
+
+    decided, correct, latencies = set(), 0, []
+    end_of_script = epoch + (first_phrase + events * period) / speed + 2.0
+    while len(decided) < events and time.monotonic() < end_of_script:
+        try:
+            utterance = utterances.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if not is_wake(utterance.text):
+            continue
+        # Tell the phrase by when its capture ended: the fake recognizer reports
+        # whatever the microphone played last, which may be a later phrase by now
+        event = int(((utterance.captured_at - epoch) * speed - first_phrase) // period)
+        if event in decided or not 0 <= event < events:
+            continue
+        winner = utterance
+
+        decided.add(event)
+        expected = max(range(room_count), key=lambda room: amplitudes[event][room])
+        correct += winner.room == f"room{expected}"
+        phrase_end = epoch + (first_phrase + event * period + duration) / speed
+        latencies.append(time.monotonic() - phrase_end)
+
+    wall = time.monotonic() - epoch
+    cpu = time.process_time() - cpu_start
+    for pipeline in pipelines:
+        pipeline.stop()
+    arbiter.stop()
+    for pipeline in pipelines:
+        pipeline.join(timeout=5)
+    arbiter.join(timeout=5)
+
+    return {
+        'rooms': room_count,
+        'decided': len(decided),
+        'correct': correct,
+        'latency_ms': 1000 * sum(latencies) / max(len(latencies), 1),
+        'uploads': recognizer.calls / max(len(decided), 1),
+        'cpu_pct': 100 * cpu / wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--events", type=int, default=8)
+    parser.add_argument("--period", type=float, default=3.0, help="seconds of audio between wake phrases")
+    parser.add_argument("--speed", type=float, default=4.0, help="playback speed relative to real time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, nargs=2, default=[0.1, 0.6],
+                        help="range of seconds per recognition upload")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    print(f"{'rooms':>5} {'decided':>8} {'correct':>8} {'latency ms':>11} {'uploads/phrase':>15} {'cpu %':>6}")
+    for room_count in args.rooms:
+        result = run_scenario(room_count, args.events, args.period, args.speed, args.seed, tuple(args.latency))
+        print(f"{result['rooms']:>5} {result['decided']:>8} {result['correct']:>8} "
+              f"{result['latency_ms']:>11.0f} {result['uploads']:>15.1f} {result['cpu_pct']:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Cache hit rate with and without usage-driven prefetch over simulated weeks.
+
+Replays a household's habits (morning weather and music, an evening
+playlist, a few recurring topics) mixed with one-off requests, on a virtual
+clock so weeks pass in seconds. Every integration is a counting fake with a
+fixed latency, so the report shows how many requests would have waited on the
+network. Run from the project root:
+
+    python -m benchmarks.prefetch --days 28
+"""
+import argparse
+import os
+import random
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta
+
+from config import Config
+from prefetch import Prefetcher, UsageHistory
+
+# (hour, minute, intent, entity, chance per day)
+HABITS = [
+    (7, 10, "weather", None, 0.9),
+    (7, 25, "play_spotify", "morning jazz", 0.7),
+    (8, 5, "wikipedia", "word of the day", 0.5),
+    (12, 30, "weather", "london", 0.4),
+    (18, 40, "weather", None, 0.6),
+    (19, 15, "play_spotify", "dinner playlist", 0.8),
+    (21, 0, "wikipedia", "history of tea", 0.3),
+]
+ONE_OFFS_PER_DAY = 6
+
+
+class VirtualClock:
+    def __init__(self, start):
+        self.now = start.timestamp()
+
+    def __call__(self):
+        return self.now
+
+
+def day_of_requests(day, rng):
+    """(timestamp, intent, entity) for one simulated day, in order"""
+    requests = []
+    for hour, minute, intent, entity, chance in HABITS:
+        if rng.random() < chance:
+            at = day + timedelta(hours=hour, minutes=minute + rng.randint(-15, 15))
+            requests.append((at.timestamp(), intent, entity))
+    for _ in range(ONE_OFFS_PER_DAY):
+        intent = rng.choice(["weather", "wikipedia", "play_spotify"])
+        at = day + timedelta(hours=rng.randint(7, 22), minutes=rng.randint(0, 59))
+        requests.append((at.timestamp(), intent, f"one off {rng.randrange(10 ** 6)}"))
+    return sorted(requests)
+
+
+def simulate(days, prefetch, seed, history_path):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    clock = VirtualClock(start)
+    network = Counter()
+
+    def source(intent):
+        def fetch(entity):
+            network[intent] += 1
+            return f"{intent} answer for {entity or Config.DEFAULT_CITY}"
+        return fetch
+
+    history = UsageHistory(history_path)
+    prefetcher = Prefetcher({
+        "weather": (source("weather"), Config.WEATHER_CACHE_TTL),
+        "wikipedia": (source("wikipedia"), Config.WIKIPEDIA_CACHE_TTL),
+        "play_spotify": (source("play_spotify"), Config.SPOTIFY_SEARCH_CACHE_TTL),
+    }, history if prefetch else None, clock)
+
+    waited = 0
+    for day_number in range(days):
+        day = start + timedelta(days=day_number)
+        requests = iter(day_of_requests(day, rng))
+        pending = next(requests, None)
+        # Walk the day one prefetch interval at a time, serving requests as they come due
+        tick = day.timestamp()
+        while tick < (day + timedelta(days=1)).timestamp():
+            clock.now = tick
+            prefetcher.prefetch(when=tick)
+            tick += Config.PREFETCH_INTERVAL
+            while pending and pending[0] < tick:
+                at, intent, entity = pending
+                clock.now = at
+                cached = sum(network.values())
+                prefetcher.fetch(intent, entity)
+                history.record(intent, entity, when=at)
+                waited += sum(network.values()) > cached
+                pending = next(requests, None)
+    history.close()
+    requests = sum(stats["requests"] for stats in prefetcher.stats.values())
+    return prefetcher, requests, waited, sum(network.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=28)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.4, help="seconds per network lookup")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="assistant-prefetch-")
+    print(f"{args.days} simulated days, {len(HABITS)} habits and {ONE_OFFS_PER_DAY} one-off requests a day\n")
+    print(f"{'':>12} {'requests':>9} {'waited':>7} {'hit rate':>9} {'net calls':>10} {'wait time':>10}")
+    for prefetch in (False, True):
+        path = os.path.join(workdir, f"usage-{prefetch}.db")
+        prefetcher, requests, waited, calls = simulate(args.days, prefetch, args.seed, path)
+        label = "prefetch" if prefetch else "cache only"
+        print(f"{label:>12} {requests:>9} {waited:>7} {100 * (1 - waited / requests):>8.1f}% "
+              f"{calls:>10} {waited * args.latency:>9.0f}s")
+    print()
+    print(prefetcher.report())
+
+
+if __name__ == "__main__":
+    main()
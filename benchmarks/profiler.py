@@ -0,0 +1,112 @@
+"""Overhead of the sampling profiler, and whether it catches slow turns.
+
+Replays scripted turns through the real assistant (speech and integrations are
+the replay fakes) with the profiler off and at several sample rates, then
+replays a few turns against a slow Wikipedia fake to check that exactly those
+turns are saved, with the slow call on top of the stack. Capture in that run
+takes longer than the threshold, which must not make every turn slow since
+latency counts from the end of capture. Run from the project root:
+
+    python -m benchmarks.profiler --turns 20000 --rates 100 1000
+"""
+import argparse
+import contextlib
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+
+from config import Config
+from benchmarks.fakes import FakeBrowser, FakeWikipedia, replay_assistant_class
+
+COMMANDS = [
+    "what time is it",
+    "weather in city {n}",
+    "tell me about topic {n}",
+    "play song number {n} on spotify",
+    "pause the music and tell me the weather in town {n}",
+    "open gmail",
+]
+
+
+def script(turns):
+    for turn in range(turns):
+        yield "hey assistant"
+        yield COMMANDS[turn % len(COMMANDS)].format(n=turn)
+
+
+def replay(turns, rate, directory, capture=0.0):
+    """Run `turns` turns, each listen taking `capture` seconds; returns (seconds, profiler or None)"""
+    Config.PROFILE = rate is not None
+    if rate:
+        Config.PROFILE_SAMPLE_RATE = rate
+    Config.PROFILE_DIR = directory
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        assistant = replay_assistant_class()(script(turns))
+        if capture:
+            scripted = assistant.listen
+
+            def listen(timeout=None):
+                time.sleep(capture)
+                return scripted(timeout)
+            assistant.listen = listen
+        started = time.perf_counter()
+        assistant.run()
+        elapsed = time.perf_counter() - started
+        if assistant.profiler:
+            assistant.profiler.stop()
+    return elapsed, assistant.profiler
+
+
+def hottest_leaf(path):
+    leaves = Counter()
+    with open(path, encoding="utf-8") as profile_file:
+        for line in profile_file:
+            stack, count = line.rsplit(" ", 1)
+            leaves[stack.split(";")[-1]] += int(count)
+    return leaves.most_common(1)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=20000)
+    parser.add_argument("--rates", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--slow-turns", type=int, default=6)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="assistant-profile-")
+    Config.CONFIG_RELOAD = False
+    Config.USAGE_HISTORY = False
+    Config.OPENWEATHER_API_KEY = "replay"
+    Config.PROFILE_SLOW_TURN = 0.25
+    logging.basicConfig(level=logging.INFO, filename=os.path.join(workdir, "profile.log"), force=True)
+
+    import app
+    app.webbrowser = FakeBrowser()
+    app.wikipedia = FakeWikipedia()
+
+    baseline, _ = replay(args.turns, None, workdir)
+    print(f"{'profiler':>10} {'turns/s':>9} {'slowdown':>9} {'samples':>8} {'sampling cost':>14}")
+    print(f"{'off':>10} {args.turns / baseline:>9.0f} {'':>9} {'':>8} {'':>14}")
+    for rate in args.rates:
+        elapsed, profiler = replay(args.turns, rate, os.path.join(workdir, f"rate-{rate}"))
+        print(f"{rate:>8}Hz {args.turns / elapsed:>9.0f} {100 * (elapsed / baseline - 1):>8.1f}% "
+              f"{profiler.samples_taken:>8} {100 * profiler.overhead():>13.2f}%")
+
+    # Only Wikipedia turns are slow; they, and only they, should be saved
+    app.wikipedia = FakeWikipedia(latency=0.4)
+    directory = os.path.join(workdir, "slow")
+    turns = args.slow_turns * len(COMMANDS)
+    _, profiler = replay(turns, args.rates[0], directory, capture=2 * Config.PROFILE_SLOW_TURN)
+    saved = sorted(name for name in os.listdir(directory) if name.endswith("ms.folded"))
+    print(f"\n{turns} turns with a 400 ms Wikipedia and {2000 * Config.PROFILE_SLOW_TURN:.0f} ms captures: "
+          f"{profiler.slow_turns} flagged slow, {len(saved)} profiles saved")
+    if saved:
+        frame, samples = hottest_leaf(os.path.join(directory, saved[0]))
+        print(f"{saved[0]}: hottest frame {frame} ({samples} samples)")
+    print(f"Profiles in {workdir}")
+
+
+if __name__ == "__main__":
+    main()
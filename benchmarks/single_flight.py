@@ -0,0 +1,100 @@
+"""Upstream calls as duplicate concurrent lookups grow, with and without single-flight.
+
+Each round fires `concurrency` simultaneous weather, Wikipedia and Spotify
+lookups for the same query, cased and spaced differently per caller ("London",
+" LONDON ", ...), through the assistant's real fetch path against slow fakes.
+With single-flight the upstream count per round should stay at one per
+integration however many callers pile on. Run from the project root:
+
+    python -m benchmarks.single_flight --concurrency 1 2 4 8 16 32 64
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import threading
+import time
+
+from config import Config
+from benchmarks.fakes import FakeSession, FakeSpotify, FakeWikipedia, FakeBrowser, replay_assistant_class
+
+INTEGRATIONS = ["weather", "wikipedia", "play_spotify"]
+SPELLINGS = ["{}", " {}", "{} ", "  {} ", "{}\t", "{}  "]
+
+
+def run_round(assistant, query, concurrency):
+    """Latencies of `concurrency` callers per integration, all released at once"""
+    barrier = threading.Barrier(concurrency * len(INTEGRATIONS))
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def caller(intent, index):
+        spelling = SPELLINGS[index % len(SPELLINGS)].format(query)
+        if index % 2:
+            spelling = spelling.upper()
+        barrier.wait()
+        started = time.perf_counter()
+        try:
+            assistant.prefetcher.fetch(intent, spelling)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    threads = [
+        threading.Thread(target=caller, args=(intent, index))
+        for intent in INTEGRATIONS for index in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per upstream call")
+    args = parser.parse_args()
+
+    Config.CONFIG_RELOAD = False
+    Config.USAGE_HISTORY = False
+    Config.OPENWEATHER_API_KEY = "replay"
+
+    import app
+    app.webbrowser = FakeBrowser()
+    app.wikipedia = FakeWikipedia(args.latency)
+    http, spotify = FakeSession(args.latency), FakeSpotify(args.latency)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        assistant = replay_assistant_class()([], http=http, spotify=spotify)
+
+    def upstream():
+        return http.calls + spotify.searches + app.wikipedia.lookups
+
+    print(f"{'callers':>8} {'mode':>14} {'upstream/round':>15} {'p50 ms':>8} {'max ms':>8} {'coalesced':>10}")
+    for concurrency in args.concurrency:
+        for single_flight in (False, True):
+            Config.SINGLE_FLIGHT = single_flight
+            latencies, errors, calls = [], [], 0
+            coalesced = sum(assistant.prefetcher.flights.coalesced.values())
+            for round_number in range(args.rounds):
+                query = f"city {concurrency} {single_flight} {round_number}"
+                before = upstream()
+                round_latencies, round_errors = run_round(assistant, query, concurrency)
+                calls += upstream() - before
+                latencies += round_latencies
+                errors += round_errors
+            coalesced = sum(assistant.prefetcher.flights.coalesced.values()) - coalesced
+            mode = "single-flight" if single_flight else "independent"
+            print(f"{concurrency * len(INTEGRATIONS):>8} {mode:>14} {calls / args.rounds:>15.1f} "
+                  f"{statistics.median(latencies) * 1000:>8.0f} {max(latencies) * 1000:>8.0f} {coalesced:>10}"
+                  + (f"  ({len(errors)} errors)" if errors else ""))
+    print()
+    print(assistant.prefetcher.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Soak test: drive many simulated turns through the real assistant and fail on memory growth.
+
+Speech, TTS, Spotify, HTTP, Wikipedia and the browser are replaced by the
+replay fakes; everything in between (intent matching, compound commands,
+quick answers, caches, logging) is the production code. Allocation tracing is
+on, as it is by default in daemon mode; --no-tracemalloc runs faster but no
+longer matches production. Run from the project root:
+
+    python -m benchmarks.soak --turns 200000 --max-growth-mb 20
+"""
+import argparse
+import contextlib
+import gc
+import itertools
+import logging
+import logging.handlers
+import os
+import sys
+import tempfile
+import time
+
+from config import Config
+from memory_monitor import resident_memory_bytes, format_bytes
+from benchmarks.fakes import FakeBrowser, FakeWikipedia, replay_assistant_class
+
+COMMANDS = [
+    "what time is it",
+    "what is the date",
+    "weather in city {n}",
+    "tell me about topic {n}",
+    "search google for question {n}",
+    "play song number {n} on spotify",
+    "next song",
+    "pause the music and tell me the weather in town {n}",
+    "open gmail",
+    "gibberish {n}",
+]
+
+
+def script(turns, checkpoints, on_checkpoint):
+    """Wake word + command per turn, with the occasional misheard or wake-less phrase"""
+    commands = itertools.cycle(COMMANDS)
+    for turn in range(turns):
+        if turn in checkpoints:
+            on_checkpoint(turn)
+        if turn % 97 == 0:
+            yield "unknown"  # recognition failure path
+        if turn % 89 == 0:
+            yield "play something please"  # command without wake word
+        yield "hey assistant"
+        yield next(commands).format(n=turn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200000)
+    parser.add_argument("--warmup", type=float, default=0.1, help="fraction of turns before the baseline")
+    parser.add_argument("--max-growth-mb", type=float, default=20.0)
+    parser.add_argument("--no-tracemalloc", dest="tracemalloc", action="store_false",
+                        help="skip allocation tracing (faster, but not the daemon mode default)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="assistant-soak-")
+    Config.DAEMON_MODE = True
+    Config.TRACEMALLOC = args.tracemalloc
+    Config.CONFIG_RELOAD = False
+    Config.DAEMON_HOUSEKEEPING_INTERVAL = 1
+    Config.MEMORY_REPORT_DIR = os.path.join(workdir, "reports")
+    Config.USAGE_HISTORY_FILE = os.path.join(workdir, "usage.db")
+    Config.OPENWEATHER_API_KEY = "replay"
+    Config.QUICK_ANSWER_SEARCH_URL = "http://replay.invalid/search"
+
+    handler = logging.handlers.RotatingFileHandler(
+        os.path.join(workdir, "soak.log"), maxBytes=Config.LOG_MAX_BYTES, backupCount=Config.LOG_BACKUP_COUNT
+    )
+    logging.basicConfig(level=logging.INFO, handlers=[handler], force=True)
+
+    import app
+    app.webbrowser = FakeBrowser()
+    app.wikipedia = FakeWikipedia()
+
+    warmup_turn = int(args.turns * args.warmup)
+    step = max(args.turns // 10, 1)
+    checkpoints = set(range(0, args.turns, step)) | {warmup_turn}
+    samples = {}
+
+    def on_checkpoint(turn):
+        gc.collect()
+        samples[turn] = resident_memory_bytes()
+        print(f"turn {turn:>8}: resident {format_bytes(samples[turn])}", file=sys.__stdout__, flush=True)
+
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        assistant = replay_assistant_class()(script(args.turns, checkpoints, on_checkpoint))
+        assistant.run()
+        gc.collect()
+        final = resident_memory_bytes()
+        report = assistant.memory_monitor.report(top=10)
+    elapsed = time.perf_counter() - started
+
+    print(f"turn {args.turns:>8}: resident {format_bytes(final)}")
+    print(f"{args.turns} turns in {elapsed:.1f} s ({args.turns / elapsed:.0f} turns/s), "
+          f"{assistant.tts_engine.utterances} responses spoken, logs in {workdir}")
+    print(report)
+
+    if final is None or samples.get(warmup_turn) is None:
+        print("⚠️ Resident memory is not readable on this platform; growth not checked")
+        return 0
+    growth_mb = (final - samples[warmup_turn]) / (1024 * 1024)
+    print(f"Growth after warm-up: {growth_mb:.1f} MiB (limit {args.max_growth_mb} MiB)")
+    if growth_mb > args.max_growth_mb:
+        print("❌ Memory grew past the limit")
+        return 1
+    print("✅ Memory stayed flat")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
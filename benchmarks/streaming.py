@@ -0,0 +1,149 @@
+"""Time from the end of a spoken command to its action, with and without early commit.
+
+A synthetic microphone plays one command in real time. The batch path waits
+for the end-of-phrase pause and a simulated Google round trip before matching
+the intent. The streaming path feeds a scripted incremental decoder (it
+reveals the words as their audio arrives, like Vosk partial results) and acts
+once the partials are stable. The "misheard" scenario has the local decoder
+hear "next song" where the final transcript says otherwise, and checks the
+skip is undone; the "misheard pause" scenarios check that an early pause is
+only undone by resuming if music was playing before. "go back" has no exact
+undo, so it must wait for the final transcript. "local final" also
+trusts the local transcript instead of waiting for Google. Run from the project root:
+
+    python -m benchmarks.streaming --trials 3
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import time
+import types
+
+import speech_recognition as sr
+
+from config import Config
+from audio_devices import AudioDeviceManager
+from benchmarks.fakes import FakeSpotify, FakeRecognizer, SyntheticMicrophone, replay_assistant_class
+
+PHRASE_START, PHRASE_LENGTH = 1.0, 1.2  # seconds into the microphone timeline
+
+# (name, what was said, what the local decoder hears, playing before, expected playback calls)
+SCENARIOS = [
+    ("next song", "next song", None, True, ["next_track"]),
+    ("go back", "go back", None, True, ["previous_track"]),
+    ("pause music", "pause music", None, True, ["pause_playback"]),
+    ("misheard", "text some one", "next song", True, ["next_track", "previous_track"]),
+    ("misheard pause", "text some one", "pause music", True, ["pause_playback", "start_playback"]),
+    ("pause, idle", "text some one", "pause music", False, ["pause_playback"]),
+]
+
+
+class TimedSpotify(FakeSpotify):
+    """Remembers when each playback call arrived"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def _record(self, name):
+        self.calls.append((name, time.monotonic()))
+
+    def next_track(self, *args, **kwargs):
+        self._record("next_track")
+
+    def previous_track(self, *args, **kwargs):
+        self._record("previous_track")
+
+    def pause_playback(self, *args, **kwargs):
+        super().pause_playback()
+        self._record("pause_playback")
+
+    def start_playback(self, *args, **kwargs):
+        super().start_playback()
+        self._record("start_playback")
+
+
+def scripted_decoder(microphone, heard=None):
+    """Decoder factory revealing each word of the current phrase once its audio has been read"""
+
+    class ScriptedDecoder:
+        def __init__(self, sample_rate):
+            self.words = []
+
+        def accept(self, pcm):
+            position = microphone.stream.position
+            for start, stop, _, text in microphone.phrases:
+                if start <= position:
+                    words = (heard or text).split()
+                    spoken = min((position - start) / (stop - start), 1.0)
+                    self.words = words[:int(spoken * len(words))]
+            return " ".join(self.words)
+
+        def final(self):
+            return " ".join(self.words)
+
+    return ScriptedDecoder
+
+
+def run_trial(assistant, spotify, said, heard, playing, mode, seed):
+    microphone = SyntheticMicrophone(
+        [(PHRASE_START, PHRASE_LENGTH, 0.3, said)], realtime_factor=1.0, seed=seed
+    )
+    assistant.microphone, assistant.microphone_name = microphone, "synthetic"
+    assistant.recognizer = sr.Recognizer()
+    # A steady synthetic tone would otherwise drag the threshold up and cut the phrase short
+    assistant.recognizer.dynamic_energy_threshold = False
+    assistant.recognizer.recognize_google = FakeRecognizer(microphone, latency=(0.5, 0.7))
+    assistant.decoder_factory = scripted_decoder(microphone, heard) if mode != "batch" else None
+    Config.STREAMING_FINAL = "local" if mode == "local final" else "google"
+    spotify.calls, spotify.playing = [], playing
+
+    text = assistant.listen_for_command(timeout=5)
+    assistant.process_command(text)
+    replied = time.monotonic()
+
+    phrase_end = microphone._timeline.started + PHRASE_START + PHRASE_LENGTH
+    first_action = spotify.calls[0][1] - phrase_end if spotify.calls else None
+    return first_action, replied - phrase_end, [name for name, _ in spotify.calls]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=3)
+    args = parser.parse_args()
+
+    Config.CONFIG_RELOAD = False
+    Config.USAGE_HISTORY = False
+    Config.AUDIO_DEVICE_POLL_INTERVAL = None
+
+    spotify = TimedSpotify()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        assistant = replay_assistant_class()([], spotify=spotify)
+    import app
+    assistant.audio_devices = AudioDeviceManager(list_names=lambda: ["synthetic"])
+    # The replay assistant scripts listen(); measure the real one
+    assistant.listen = types.MethodType(app.AdvancedVoiceAssistant.listen, assistant)
+
+    print(f"{'scenario':>14} {'mode':>11} {'action after speech':>20} {'reply after speech':>19}  playback calls")
+    failures = 0
+    for name, said, heard, playing, expected in SCENARIOS:
+        for mode in ("batch", "streaming", "local final"):
+            actions, replies, calls = [], [], None
+            for trial in range(args.trials):
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    action, reply, calls = run_trial(assistant, spotify, said, heard, playing, mode, trial)
+                if action is not None:
+                    actions.append(action)
+                replies.append(reply)
+            action_ms = f"{statistics.median(actions) * 1000:+.0f} ms" if actions else "no action"
+            print(f"{name:>14} {mode:>11} {action_ms:>20} {statistics.median(replies) * 1000:>16.0f} ms  "
+                  f"{', '.join(calls) or '-'}")
+            if mode == "streaming" and calls != expected:
+                failures += 1
+                print(f"❌ expected {', '.join(expected)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
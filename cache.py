@@ -0,0 +1,112 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a fixed time"""
+
+    def __init__(self, max_entries, ttl, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[1] >= self.clock()
+
+    def ttl_remaining(self, key):
+        """Seconds until key expires, or None if it isn't cached"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            remaining = entry[1] - self.clock()
+            return remaining if remaining >= 0 else None
+
+    def reconfigure(self, max_entries, ttl):
+        """Apply a new size and TTL; cached entries keep the expiry they were stored with"""
+        with self._lock:
+            self.max_entries, self.ttl = max_entries, ttl
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class BoundedMemo:
+    """Memoize a function on its arguments, keeping at most max_entries results
+
+    Replaces third-party memo decorators that grow forever. The cache is read
+    and updated under one lock, so eviction can't land between finding a key
+    and reading it; the wrapped function itself runs outside the lock.
+    """
+
+    def __init__(self, fn, max_entries, items=()):
+        self.fn = fn
+        self.max_entries = max_entries
+        self._cache = OrderedDict(items)
+        self._lock = threading.Lock()
+        functools.update_wrapper(self, fn)
+        self.resize(max_entries)
+
+    def __call__(self, *args, **kwargs):
+        key = str(args) + str(kwargs)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        value = self.fn(*args, **kwargs)
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            self._evict()
+        return value
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cache)
+
+    def _evict(self):
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def resize(self, max_entries):
+        with self._lock:
+            self.max_entries = max_entries
+            self._evict()
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
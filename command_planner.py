@@ -0,0 +1,73 @@
+import logging
+import re
+from collections import namedtuple, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+PlannedCommand = namedtuple('PlannedCommand', ['text', 'intent', 'entity'])
+
+
+class CommandPlanner:
+    """Split compound utterances into separate commands and run them concurrently"""
+
+    def __init__(self, extract, execute, max_workers=None):
+        # extract(text) -> (intent, entity); execute(PlannedCommand) -> result
+        self.extract = extract
+        self.execute = execute
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.COMMAND_MAX_PARALLEL,
+            thread_name_prefix="command"
+        )
+
+    def plan(self, text):
+        """Return the commands in an utterance, in the order they were asked"""
+        pieces = re.split(f"({Config.COMPOUND_SPLIT_PATTERN})", text)
+        parts, separators = pieces[0::2], pieces[1::2]
+
+        commands = []
+        for index, part in enumerate(parts):
+            if not part.strip():
+                continue
+            intent, entity = self.extract(part)
+            # "rock and roll" is one entity, not two commands: glue a part that
+            # matches nothing back onto the command before it
+            if intent == "unknown" and commands:
+                previous = commands.pop()
+                part = previous.text + separators[index - 1] + part
+                intent, entity = self.extract(part)
+            commands.append(PlannedCommand(part.strip(), intent, entity))
+
+        if len(commands) < 2 or any(command.intent == "unknown" for command in commands):
+            intent, entity = self.extract(text)
+            return [PlannedCommand(text, intent, entity)]
+        return commands
+
+    def run(self, commands):
+        """Execute commands and yield their results in the order they were asked
+
+        Commands that touch the same resource (see Config.INTENT_RESOURCES) run
+        one after another in their original order; everything else overlaps, so
+        a multi-part request takes about as long as its slowest part.
+        """
+        groups = OrderedDict()
+        for index, command in enumerate(commands):
+            resource = Config.INTENT_RESOURCES.get(command.intent, f"independent-{index}")
+            groups.setdefault(resource, []).append(index)
+
+        results = [Future() for _ in commands]
+        for indexes in groups.values():
+            self.executor.submit(self._run_group, commands, indexes, results)
+
+        for future in results:
+            yield future.result()
+
+    def _run_group(self, commands, indexes, results):
+        for index in indexes:
+            try:
+                results[index].set_result(self.execute(commands[index]))
+            except Exception as e:
+                logger.error(f"Command '{commands[index].text}' failed: {e}")
+                results[index].set_exception(e)
@@ -1,4 +1,6 @@
 import os
+import copy
+import json
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -18,6 +20,44 @@ class Config:
     PHRASE_TIME_LIMIT = 10  # seconds
     AMBIENT_NOISE_DURATION = 0.5  # seconds
     
+    # Streaming Recognition (act on stable partial results while the user is still talking)
+    # Needs `pip install vosk` and a model from https://alphacephei.com/vosk/models
+    STREAMING_RECOGNITION = True  # only used when vosk and the model are installed
+    STREAMING_MODEL = os.getenv('VOSK_MODEL', 'models/vosk-model-small-en-us-0.15')
+    STREAMING_FINAL = 'google'  # 'google' re-checks the whole phrase online, 'local' trusts the decoder
+    EARLY_COMMIT_STABLE_SECONDS = 0.25  # seconds of audio the partial transcript must hold before acting
+    EARLY_COMMIT_INTENTS = {  # intents safe to start early -> playback action that undoes them
+        'next_song': 'previous',
+        'pause_spotify': 'resume',
+    }
+    EARLY_COMMIT_PHRASES = [  # the whole partial transcript must match one, so a prefix of a longer command never does
+        r'(next|skip) (song|track)',
+        r'pause (the )?music',
+        r'pause spotify',
+    ]
+    
+    # Audio Devices
+    MICROPHONE_PREFERENCES = ['Microphone Array']  # name fragments, most preferred first
+    AUDIO_DEVICE_POLL_INTERVAL = 30  # seconds between hot-plug checks; None to only check after errors
+    AUDIO_DEVICE_RETRY_INTERVAL = 2  # seconds between reopen attempts while a device is missing
+    
+    # Audio Preprocessing (applied before uploading audio for recognition)
+    AUDIO_PREPROCESSING = True
+    AUDIO_TARGET_SAMPLE_RATE = 16000  # Hz, speech needs no more than this
+    AUDIO_TARGET_PEAK = 0.9  # 0.0 to 1.0 of full scale
+    AUDIO_MAX_GAIN = 8.0  # never boost quiet audio more than this
+    AUDIO_RESAMPLE_HALF_WIDTH = 16  # filter taps on each side of a sample
+    AUDIO_RESAMPLE_BLOCK = 65536  # output samples filtered per vectorized step
+    
+    # Multi-Room Settings
+    # Room name -> part of the input device name, e.g.
+    # {'kitchen': 'USB Audio', 'office': 'Microphone Array'}. Empty uses a single microphone.
+    ROOMS = {}
+    ROOM_LISTEN_TIMEOUT = 1  # seconds before a room's capture loop re-checks for shutdown
+    ROOM_QUEUE_SIZE = 32  # captured or recognized phrases waiting to be handled
+    ROOM_ARBITRATION_WINDOW = 0.4  # seconds between capture ends for rooms to count as hearing one phrase
+    ROOM_COMMAND_TIMEOUT = 10  # seconds to wait for a command from the responding room
+    
     # Text-to-Speech Settings
     TTS_RATE = 180  # words per minute
     TTS_VOLUME = 0.9  # 0.0 to 1.0
@@ -68,6 +108,7 @@ class Config:
         ],
         'pause_spotify': [
             r'pause music',
+            r'pause the music',
             r'pause spotify',
             r'stop music',
             r'stop playing'
@@ -166,6 +207,59 @@ class Config:
         ]
     }
     
+    # Compound Commands ("pause the music and tell me the weather in London")
+    COMPOUND_COMMANDS = True
+    COMPOUND_SPLIT_PATTERN = r'\s*,?\s+(?:and then|and also|and|then|also)\s+|\s*[,;]\s*'
+    COMMAND_MAX_PARALLEL = 4  # parts of one request executed at the same time
+    
+    # Intents sharing a resource run in order; all others run concurrently
+    INTENT_RESOURCES = {
+        'play_spotify': 'spotify',
+        'pause_spotify': 'spotify',
+        'next_song': 'spotify',
+        'previous_song': 'spotify',
+        'search_youtube': 'browser',
+        'search_google': 'browser',
+        'news': 'browser',
+        'open_app': 'browser',
+    }
+    
+    # Quick Answers (spoken follow-up after a Google search)
+    QUICK_ANSWERS = True
+    QUICK_ANSWER_SEARCH_URL = os.getenv('QUICK_ANSWER_SEARCH_URL')  # SearxNG-style JSON endpoint; None uses Google
+    QUICK_ANSWER_WORKERS = 2  # lookups running at the same time
+    QUICK_ANSWER_MAX_PENDING = 8  # further lookups are skipped, never queued
+    QUICK_ANSWER_TIMEOUT = 5  # seconds per HTTP request
+    QUICK_ANSWER_CACHE_SIZE = 256  # entries
+    QUICK_ANSWER_CACHE_TTL = 6 * 60 * 60  # seconds
+    QUICK_ANSWER_MAX_AGE = 60  # seconds; older answers are not offered anymore
+    QUICK_ANSWER_MAX_CHARS = 250  # spoken snippet length
+    QUICK_ANSWER_MIN_CHARS = 60  # shorter paragraphs are not treated as an answer
+    QUICK_ANSWER_MAX_PAGE_BYTES = 200000  # bytes of the result page to download and scan
+    
+    # Offline Knowledge (see knowledge_index.py; used before Wikipedia when the file exists)
+    KNOWLEDGE_INDEX = os.getenv('KNOWLEDGE_INDEX', 'knowledge.db')
+    KNOWLEDGE_IMPORT_BATCH = 5000  # rows per import transaction
+    KNOWLEDGE_MAX_RESULTS = 5
+    KNOWLEDGE_TITLE_WEIGHT = 10.0  # BM25 weight of title matches relative to the abstract
+    KNOWLEDGE_SENTENCES = 2  # sentences spoken from an abstract
+    
+    # Answer Caches and Prefetch (warm the caches before habitual requests)
+    ANSWER_CACHE_SIZE = 128  # entries per integration
+    WEATHER_CACHE_TTL = 10 * 60  # seconds; OpenWeatherMap updates about this often
+    WIKIPEDIA_CACHE_TTL = 24 * 60 * 60  # seconds
+    SPOTIFY_SEARCH_CACHE_TTL = 24 * 60 * 60  # seconds
+    USAGE_HISTORY = True  # remember which intents and entities are asked for at what time of day
+    USAGE_HISTORY_FILE = os.getenv('USAGE_HISTORY_FILE', 'usage.db')
+    USAGE_HISTORY_DAYS = 30  # forget requests that haven't been repeated for this long
+    PREFETCH = True
+    PREFETCH_INTERVAL = 300  # seconds between prefetch passes
+    PREFETCH_WINDOW = 15 * 60  # seconds either side of a request's usual time in which asking it counts for the day
+    PREFETCH_MIN_USES = 3  # times a request must have been made at this time of day
+    PREFETCH_MAX_CANDIDATES = 20  # requests considered per pass
+    PREFETCH_BUDGET = 30  # network requests per hour spent on prefetching
+    SINGLE_FLIGHT = True  # identical lookups in flight at the same time share one request
+    
     # Supported Applications for opening
     APPLICATIONS = {
         'notepad': 'notepad.exe',
@@ -206,11 +300,13 @@ class Config:
         'spotify_no_device': "No active Spotify devices found. Please open Spotify on a device.",
         'youtube_search': "Searching YouTube for {query}",
         'google_search': "Searching Google for {query}",
+        'quick_answer': "Here's a quick answer for {query}: {snippet}",
         'weather_info': "The weather in {location} is {description} with a temperature of {temp}°C, feels like {feels_like}°C",
         'weather_not_found': "Sorry, I couldn't find weather information for {location}",
         'time_response': "The current time is {time}",
         'date_response': "Today is {date}",
         'wikipedia_info': "According to Wikipedia: {summary}",
+        'knowledge_info': "According to Wikipedia: {summary}",
         'wikipedia_not_found': "Sorry, I couldn't find information about {query} on Wikipedia",
         'app_opened': "Opening {app}",
         'app_not_found': "Sorry, I couldn't find or open {app}",
@@ -224,11 +320,83 @@ class Config:
     # File Paths
     LOG_FILE = 'assistant.log'
     CACHE_DIR = 'cache'
+    LOG_MAX_BYTES = 5 * 1024 * 1024  # rotate the log file at this size
+    LOG_BACKUP_COUNT = 3  # rotated log files kept
+    
+    # Daemon Mode (bounded memory for runs lasting weeks)
+    DAEMON_MODE = os.getenv('DAEMON_MODE', 'False').lower() == 'true'
+    DAEMON_HOUSEKEEPING_INTERVAL = 300  # seconds between cache trims
+    WIKIPEDIA_CACHE_MAX = 128  # entries kept in the wikipedia library's own memo cache
+    TRACEMALLOC = True  # trace allocations for reports (slows allocation down a little)
+    TRACEMALLOC_FRAMES = 5  # stack depth recorded per allocation
+    MEMORY_REPORT_DIR = 'memory_reports'
+    MEMORY_REPORT_PORT = None  # e.g. 8765 serves reports at http://127.0.0.1:8765/memory
+    MEMORY_REPORT_TOP = 25  # allocation sites listed per report section
+    
+    # Profiling (python app.py --profile); writes collapsed stacks for flame graph tools
+    PROFILE = False
+    PROFILE_SAMPLE_RATE = 100  # stack samples per second, all threads
+    PROFILE_SLOW_TURN = 2.0  # seconds; slower turns are saved and logged
+    PROFILE_ALL_TURNS = False  # also save turns under the threshold
+    PROFILE_IDLE_THREADS = False  # also sample threads blocked waiting for work
+    PROFILE_DIR = 'profiles'
+    PROFILE_MAX_FILES = 200  # oldest profiles are deleted past this
     
     # Network Settings
     REQUEST_TIMEOUT = 10  # seconds
     MAX_RETRIES = 3
     
+    # Live Configuration
+    # JSON file whose keys override the settings above, e.g. {"TTS_RATE": 200}.
+    # Dictionary settings such as COMMAND_PATTERNS are merged per key.
+    CONFIG_FILE = os.getenv('ASSISTANT_CONFIG_FILE', 'assistant_config.json')
+    CONFIG_RELOAD = True  # watch CONFIG_FILE and apply changes without restarting
+    CONFIG_RELOAD_INTERVAL = 1.0  # seconds between checks for changes
+    
+    _defaults = None
+    loaded = None  # the file resolution applied at import, which the watcher diffs its first reload against
+    file_error = None  # why CONFIG_FILE could not be applied at import, reported by app.main()
+    
+    @classmethod
+    def settings(cls):
+        """Return the current value of every setting"""
+        return {name: getattr(cls, name) for name in dir(cls) if name.isupper()}
+    
+    @classmethod
+    def read_file(cls, path=None):
+        """Resolve every setting from the config file layered over the built-in defaults"""
+        path = path or cls.CONFIG_FILE
+        if cls._defaults is None:
+            cls._defaults = copy.deepcopy(cls.settings())
+        
+        resolved = copy.deepcopy(cls._defaults)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as config_file:
+                overrides = json.load(config_file)
+            for name, value in overrides.items():
+                if name not in resolved:
+                    raise ValueError(f"Unknown setting in {path}: {name}")
+                if isinstance(resolved[name], dict) and isinstance(value, dict):
+                    resolved[name].update(value)
+                else:
+                    resolved[name] = value
+        return resolved
+    
+    @classmethod
+    def changed_settings(cls, resolved, previous):
+        """Return the subset of resolved settings that differ from a previous resolution
+        
+        Comparing file against file rather than against the live settings keeps
+        overrides made at startup, such as --daemon, from looking like edits.
+        """
+        return {name: value for name, value in resolved.items() if previous.get(name) != value}
+    
+    @classmethod
+    def apply(cls, changes):
+        """Overwrite settings in place"""
+        for name, value in changes.items():
+            setattr(cls, name, value)
+    
     @classmethod
     def validate_config(cls):
         """Validate configuration settings"""
@@ -280,5 +448,14 @@ class Config:
         
         print("="*50 + "\n")
 
+# Apply the optional config file on top of the defaults
+try:
+    Config.loaded = Config.read_file()
+    Config.apply(Config.loaded)
+except (OSError, ValueError) as e:
+    # Invalid JSON or an unknown key; keep the defaults and let the caller decide
+    Config.loaded = copy.deepcopy(Config._defaults)
+    Config.file_error = e
+
 # Make sure Config is available when importing from this module
 __all__ = ['Config']
\ No newline at end of file
@@ -0,0 +1,60 @@
+import logging
+import os
+import threading
+import time
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigWatcher(threading.Thread):
+    """Poll the config file and hand changed settings to a callback"""
+
+    def __init__(self, on_change, path=None, interval=None):
+        super().__init__(name="config-watcher", daemon=True)
+        self.on_change = on_change
+        self.path = path or Config.CONFIG_FILE
+        self.interval = interval or Config.CONFIG_RELOAD_INTERVAL
+        self.last_reload_ms = None
+        self.resolved = Config.loaded
+        self._stop_event = threading.Event()
+
+    def _modified_time(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        last_modified = self._modified_time()
+        # Catch edits made between the import-time load and this thread starting
+        self.reload()
+        while not self._stop_event.wait(self.interval):
+            modified = self._modified_time()
+            if modified != last_modified:
+                last_modified = modified
+                self.reload()
+
+    def reload(self):
+        """Re-read the file and apply whatever changed; returns the changed setting names"""
+        started = time.perf_counter()
+        try:
+            resolved = Config.read_file(self.path)
+            changes = Config.changed_settings(resolved, self.resolved)
+            if changes:
+                self.on_change(changes)
+            # Only once applied, so a failed change is retried on the next edit
+            self.resolved = resolved
+        except Exception as e:
+            # A half-written or invalid file must never take down the running assistant
+            logger.error(f"Config reload failed, keeping current settings: {e}")
+            return []
+
+        self.last_reload_ms = (time.perf_counter() - started) * 1000
+        if changes:
+            logger.info(f"🔄 Reloaded {', '.join(sorted(changes))} in {self.last_reload_ms:.1f} ms")
+        return sorted(changes)
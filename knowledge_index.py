@@ -0,0 +1,272 @@
+"""Local full-text knowledge index for answering "tell me about ..." offline.
+
+Build or update the index from a bulk abstracts file, then the assistant
+checks it before going to Wikipedia:
+
+    python knowledge_index.py import enwiki-latest-abstract.xml.gz
+    python knowledge_index.py import abstracts.jsonl
+    python knowledge_index.py search "ada lovelace"
+
+Supported sources (optionally .gz or .bz2 compressed): the Wikipedia abstract
+dump XML, JSON lines with "title" and "abstract" fields, and tab-separated
+"title<TAB>abstract" lines.
+"""
+import argparse
+import bz2
+import gzip
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ElementTree
+from itertools import islice
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    abstract TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, abstract, content='articles', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, abstract) VALUES (new.id, new.title, new.abstract);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, abstract)
+    VALUES ('delete', old.id, old.title, old.abstract);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, abstract)
+    VALUES ('delete', old.id, old.title, old.abstract);
+    INSERT INTO articles_fts(rowid, title, abstract) VALUES (new.id, new.title, new.abstract);
+END;
+CREATE TABLE IF NOT EXISTS imports (
+    source TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    modified INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    imported_at REAL NOT NULL
+);
+"""
+
+# Only touch rows whose text actually changed, so re-imports stay cheap
+UPSERT = """
+INSERT INTO articles (title, abstract) VALUES (?, ?)
+ON CONFLICT(title) DO UPDATE SET abstract = excluded.abstract
+WHERE abstract != excluded.abstract
+"""
+
+
+def first_sentences(text, count=None):
+    """The first `count` sentences of text, like wikipedia.summary(sentences=count)"""
+    count = count or Config.KNOWLEDGE_SENTENCES
+    sentences = re.split(r"(?<=[.!?])\s+", " ".join(text.split()))
+    return " ".join(sentences[:count])
+
+
+def open_source(path):
+    """Open a possibly compressed text file for streaming"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def read_wikipedia_abstracts(source):
+    """Yield (title, abstract) from the Wikipedia abstract dump without building the tree"""
+    title, root = None, None
+    for event, element in ElementTree.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+            continue
+        if element.tag == "title":
+            title = element.text or ""
+            if title.startswith("Wikipedia: "):
+                title = title[len("Wikipedia: "):]
+            title = title.strip()
+        elif element.tag == "abstract":
+            abstract = (element.text or "").strip()
+            if title and abstract:
+                yield title, abstract
+        elif element.tag == "doc":
+            # Clearing only the <doc> would leave an empty element per article on the root
+            title = None
+            root.clear()
+
+
+def read_records(path):
+    """Yield (title, abstract) pairs from any supported source file, one line at a time"""
+    base = re.sub(r"\.(gz|bz2)$", "", path)
+    with open_source(path) as source:
+        if base.endswith(".xml"):
+            yield from read_wikipedia_abstracts(source)
+            return
+        for line in source:
+            line = line.strip()
+            if not line:
+                continue
+            if base.endswith((".jsonl", ".json")):
+                record = json.loads(line)
+                title, abstract = record.get("title"), record.get("abstract") or record.get("text")
+            else:
+                title, _, abstract = line.partition("\t")
+            if title and abstract:
+                yield title.strip(), abstract.strip()
+
+
+class KnowledgeIndex:
+    """SQLite FTS5 store of article abstracts"""
+
+    def __init__(self, path=None):
+        self.path = path or Config.KNOWLEDGE_INDEX
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def import_records(self, records, batch_size=None, progress=None):
+        """Upsert (title, abstract) pairs in batched transactions; returns rows read"""
+        batch_size = batch_size or Config.KNOWLEDGE_IMPORT_BATCH
+        rows = 0
+        records = iter(records)
+        with self._lock:
+            connection = self._connection
+            # Building from scratch: skip the per-row FTS triggers and index
+            # everything in one pass at the end, which is several times faster
+            bulk = connection.execute("SELECT 1 FROM articles LIMIT 1").fetchone() is None
+            if bulk:
+                connection.executescript("DROP TRIGGER articles_ai; DROP TRIGGER articles_au;")
+            # A crash mid-import only loses the current batch, so durability can wait
+            connection.execute("PRAGMA synchronous=OFF")
+            try:
+                while True:
+                    batch = list(islice(records, batch_size))
+                    if not batch:
+                        break
+                    with connection:
+                        connection.executemany(UPSERT, batch)
+                    rows += len(batch)
+                    if progress:
+                        progress(rows)
+            finally:
+                if bulk:
+                    with connection:
+                        connection.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+                    connection.executescript(SCHEMA)
+                connection.execute("PRAGMA synchronous=NORMAL")
+        return rows
+
+    def import_file(self, path, batch_size=None, force=False, progress=None):
+        """Stream a source file into the index; unchanged files are skipped unless force"""
+        stat = os.stat(path)
+        source = os.path.abspath(path)
+        with self._lock:
+            previous = self._connection.execute(
+                "SELECT size, modified FROM imports WHERE source = ?", (source,)
+            ).fetchone()
+        if previous == (stat.st_size, stat.st_mtime_ns) and not force:
+            logger.info(f"{path} is unchanged since its last import, skipping")
+            return 0
+
+        rows = self.import_records(read_records(path), batch_size, progress)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO imports VALUES (?, ?, ?, ?, ?)",
+                (source, stat.st_size, stat.st_mtime_ns, rows, time.time())
+            )
+        return rows
+
+    def optimize(self):
+        """Merge FTS segments after a large import for faster queries"""
+        with self._lock, self._connection:
+            self._connection.execute("INSERT INTO articles_fts(articles_fts) VALUES ('optimize')")
+
+    def search(self, query, limit=None):
+        """Ranked (title, abstract) hits: an exact title first, then title matches by BM25"""
+        limit = limit or Config.KNOWLEDGE_MAX_RESULTS
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return []
+
+        with self._lock:
+            exact = self._connection.execute(
+                "SELECT title, abstract FROM articles WHERE title = ?", (query.strip(),)
+            ).fetchone()
+            # Every query word must appear in the title; the abstract only breaks ties
+            match = "title : (" + " ".join(f'"{term}"' for term in terms) + ")"
+            ranked = self._connection.execute(
+                "SELECT title, abstract FROM articles_fts WHERE articles_fts MATCH ? "
+                "ORDER BY bm25(articles_fts, ?, 1.0) LIMIT ?",
+                (match, Config.KNOWLEDGE_TITLE_WEIGHT, limit)
+            ).fetchall()
+
+        hits = [exact] if exact else []
+        hits += [hit for hit in ranked if not exact or hit[0] != exact[0]]
+        return hits[:limit]
+
+    def lookup(self, query):
+        """Best spoken-length summary for query, or None on a miss"""
+        hits = self.search(query, limit=1)
+        return first_sentences(hits[0][1]) if hits else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the local knowledge index")
+    parser.add_argument("--db", default=Config.KNOWLEDGE_INDEX, help="index file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="add or update articles from abstract files")
+    importer.add_argument("files", nargs="+")
+    importer.add_argument("--batch", type=int, default=Config.KNOWLEDGE_IMPORT_BATCH)
+    importer.add_argument("--force", action="store_true", help="re-read files that look unchanged")
+
+    searcher = commands.add_parser("search", help="query the index")
+    searcher.add_argument("query")
+    searcher.add_argument("--limit", type=int, default=Config.KNOWLEDGE_MAX_RESULTS)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    index = KnowledgeIndex(args.db)
+
+    if args.command == "import":
+        for path in args.files:
+            started = time.perf_counter()
+
+            def progress(rows):
+                elapsed = time.perf_counter() - started
+                print(f"\r📥 {path}: {rows:,} rows ({rows / elapsed:,.0f}/s)", end="", flush=True)
+
+            rows = index.import_file(path, args.batch, args.force, progress)
+            if rows:
+                print()
+        print("🔧 Optimizing index...")
+        index.optimize()
+        print(f"✅ {len(index):,} articles in {args.db}")
+    else:
+        for title, abstract in index.search(args.query, args.limit):
+            print(f"📚 {title}: {first_sentences(abstract)}")
+    index.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
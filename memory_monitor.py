@@ -0,0 +1,173 @@
+import logging
+import os
+import signal
+import sys
+import threading
+import tracemalloc
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Allocation noise from the tracer itself and the import machinery
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def resident_memory_bytes():
+    """Current resident set size of this process, or None if it can't be read"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes; the peak is the best we can do here
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return None
+
+
+def format_bytes(size):
+    if size is None:
+        return "n/a"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024 or unit == "GiB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class MemoryMonitor:
+    """Keep long-running processes flat: bounded-container accounting,
+    periodic trimming and tracemalloc snapshot/diff reports on demand"""
+
+    def __init__(self):
+        self.containers = {}
+        self.trimmers = []
+        self.baseline = None
+        self.previous = None
+        self._server = None
+        self._stop_event = threading.Event()
+        self._report_lock = threading.Lock()
+
+    def track(self, name, size, cap):
+        """Include a bounded container in reports; size is a callable returning its length"""
+        self.containers[name] = (size, cap)
+
+    def add_trimmer(self, trim):
+        """Run trim() on every housekeeping pass"""
+        self.trimmers.append(trim)
+
+    def start(self):
+        if Config.TRACEMALLOC and not tracemalloc.is_tracing():
+            tracemalloc.start(Config.TRACEMALLOC_FRAMES)
+        if tracemalloc.is_tracing():
+            self.baseline = self.previous = self._snapshot()
+
+        if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, lambda signum, frame: threading.Thread(
+                target=self.write_report, name="memory-report", daemon=True
+            ).start())
+            logger.info(f"Send SIGUSR1 to pid {os.getpid()} for a memory report")
+
+        if Config.MEMORY_REPORT_PORT:
+            self._start_endpoint(Config.MEMORY_REPORT_PORT)
+
+        threading.Thread(target=self._housekeeping, name="housekeeping", daemon=True).start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._server:
+            self._server.shutdown()
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    def _housekeeping(self):
+        while not self._stop_event.wait(Config.DAEMON_HOUSEKEEPING_INTERVAL):
+            self.housekeeping()
+
+    def housekeeping(self):
+        """Trim caches that can't bound themselves and log the process size"""
+        for trim in self.trimmers:
+            try:
+                trim()
+            except Exception as e:
+                logger.error(f"Housekeeping error: {e}")
+        logger.info(f"Resident memory: {format_bytes(resident_memory_bytes())}")
+
+    def report(self, top=None):
+        """Build a text report: container fill, top allocations, growth since start and since last report"""
+        top = top or Config.MEMORY_REPORT_TOP
+        with self._report_lock:
+            lines = [
+                f"Memory report {datetime.now().isoformat(timespec='seconds')}",
+                f"Resident: {format_bytes(resident_memory_bytes())}",
+                "",
+                "Bounded containers:",
+            ]
+            for name, (size, cap) in sorted(self.containers.items()):
+                lines.append(f"  {name}: {size()} / {cap}")
+
+            if not tracemalloc.is_tracing():
+                lines += ["", "tracemalloc is off; set TRACEMALLOC = True for allocation sites"]
+                return "\n".join(lines)
+
+            snapshot = self._snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            lines[1] += f", traced: {format_bytes(current)} (peak {format_bytes(peak)})"
+
+            lines += ["", f"Top {top} allocation sites:"]
+            lines += [f"  {stat}" for stat in snapshot.statistics("lineno")[:top]]
+
+            if self.baseline is not None:
+                lines += ["", f"Top {top} changes since start:"]
+                lines += [f"  {stat}" for stat in snapshot.compare_to(self.baseline, "lineno")[:top]]
+            if self.previous is not None and self.previous is not self.baseline:
+                lines += ["", f"Top {top} changes since last report:"]
+                lines += [f"  {stat}" for stat in snapshot.compare_to(self.previous, "lineno")[:top]]
+
+            self.previous = snapshot
+            return "\n".join(lines)
+
+    def write_report(self):
+        """Write a report to MEMORY_REPORT_DIR and return its path"""
+        os.makedirs(Config.MEMORY_REPORT_DIR, exist_ok=True)
+        path = os.path.join(
+            Config.MEMORY_REPORT_DIR, f"memory-{datetime.now().strftime('%Y%m%d-%H%M%S')}.txt"
+        )
+        with open(path, "w", encoding="utf-8") as report_file:
+            report_file.write(self.report())
+        logger.info(f"📝 Memory report written to {path}")
+        return path
+
+    def _start_endpoint(self, port):
+        monitor = self
+
+        class ReportHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/memory":
+                    self.send_error(404)
+                    return
+                body = monitor.report().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        # Only ever bound to loopback: reports expose source paths
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), ReportHandler)
+        threading.Thread(target=self._server.serve_forever, name="memory-endpoint", daemon=True).start()
+        logger.info(f"Memory reports at http://127.0.0.1:{port}/memory")
@@ -0,0 +1,261 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from config import Config
+from cache import TTLCache
+from single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    intent TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    uses INTEGER NOT NULL,
+    minutes REAL NOT NULL,
+    last_used REAL NOT NULL,
+    query TEXT,
+    PRIMARY KEY (intent, entity, hour)
+);
+"""
+
+RECORD = """
+INSERT INTO usage (intent, entity, hour, uses, minutes, last_used, query) VALUES (?, ?, ?, 1, ?, ?, ?)
+ON CONFLICT(intent, entity, hour) DO UPDATE SET
+    uses = uses + 1, minutes = minutes + excluded.minutes, last_used = excluded.last_used, query = excluded.query
+"""
+
+
+def rate(part, whole):
+    return f"{100 * part / whole:.0f}%" if whole else "n/a"
+
+
+def cache_key(entity):
+    """Fold case and spacing only; punctuation matters ("c#" is not "c++")"""
+    return " ".join((entity or "").casefold().split())
+
+
+class UsageHistory:
+    """How often each (intent, entity) has been asked for in each hour of the day"""
+
+    def __init__(self, path=None):
+        self.path = path or Config.USAGE_HISTORY_FILE
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(usage)")]
+        if "query" not in columns:
+            # Histories written before the original wording was kept
+            self._connection.execute("ALTER TABLE usage ADD COLUMN query TEXT")
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def record(self, intent, entity, when=None):
+        """Count one request, keyed by cache_key(entity) but remembering the latest wording"""
+        when = when or time.time()
+        moment = datetime.fromtimestamp(when)
+        with self._lock, self._connection:
+            self._connection.execute(RECORD, (
+                intent, cache_key(entity), moment.hour, moment.minute + moment.second / 60, when, entity or ""
+            ))
+
+    def likely(self, intents, when=None, limit=None):
+        """(intent, entity, uses) usually asked for before the next prefetch pass, most used first
+
+        entity is the wording last used for the request, as the user said it.
+        Each usual time falls in exactly one PREFETCH_INTERVAL, so a habit is
+        offered once per day rather than on every pass around it.
+
+        A request already made within PREFETCH_WINDOW of its usual time is
+        left out: the habit is done for the day once it has been asked.
+        """
+        when = when or time.time()
+        moment = datetime.fromtimestamp(when)
+        now = moment.hour * 60 + moment.minute + moment.second / 60
+        ahead = Config.PREFETCH_INTERVAL / 60
+        intents = list(intents)
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT intent, entity, hour, uses, minutes, last_used, query FROM usage "
+                f"WHERE intent IN ({','.join('?' * len(intents))}) AND uses >= ?",
+                (*intents, Config.PREFETCH_MIN_USES)
+            ).fetchall()
+
+        likely = {}
+        for intent, key, hour, uses, minutes, last_used, query in rows:
+            usual = hour * 60 + minutes / uses
+            # Minutes from now until the usual time, across midnight if need be
+            until = (usual - now) % 1440
+            if until >= ahead or when - last_used < 2 * Config.PREFETCH_WINDOW:
+                continue
+            if uses > likely.get((intent, key), (0, None))[0]:
+                likely[intent, key] = (uses, query if query is not None else key)
+        ranked = sorted(likely.items(), key=lambda item: item[1][0], reverse=True)
+        return [(intent, entity, uses) for (intent, _), (uses, entity) in ranked[:limit or Config.PREFETCH_MAX_CANDIDATES]]
+
+    def forget(self, before):
+        """Drop habits not seen since `before` (a timestamp)"""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM usage WHERE last_used < ?", (before,))
+
+
+class Prefetcher:
+    """Read-through answer caches, warmed ahead of requests the history predicts
+
+    `sources` maps an intent to (fetch, ttl); fetch(entity) does the network
+    round trip and returns the answer to cache, or None for nothing cacheable.
+    Exceptions from fetch reach the caller of fetch() unchanged. Identical
+    lookups already in flight are joined rather than repeated.
+    """
+
+    def __init__(self, sources, history=None, clock=time.monotonic):
+        self.sources = sources
+        self.history = history
+        self.clock = clock
+        self.caches = {
+            intent: TTLCache(Config.ANSWER_CACHE_SIZE, ttl, clock) for intent, (_, ttl) in sources.items()
+        }
+        self.stats = {intent: Counter() for intent in sources}
+        self.flights = SingleFlight()
+        self._prefetched = set()  # (intent, key) warmed by a prefetch and not yet asked for
+        self._spent = deque()  # clock() of every prefetch request in the last hour
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def fetch(self, intent, entity):
+        """The answer for (intent, entity), from cache when possible"""
+        fetch, _ = self.sources[intent]
+        key = cache_key(entity)
+        answer = self.caches[intent].get(key)
+        with self._lock:
+            stats = self.stats[intent]
+            stats["requests"] += 1
+            if answer is not None:
+                stats["hits"] += 1
+                if (intent, key) in self._prefetched:
+                    self._prefetched.discard((intent, key))
+                    stats["prefetch_hits"] += 1
+        if answer is None:
+            answer, _ = self._load(intent, key, entity)
+        return answer
+
+    def _load(self, intent, key, entity, refresh=False):
+        """Fetch and cache an answer, sharing one upstream call among concurrent callers
+
+        Unless refreshing, an answer cached after the caller's miss is used as is.
+        """
+        def load():
+            if not refresh:
+                # A flight that landed between the miss and this call already cached it
+                answer = self.caches[intent].get(key)
+                if answer is not None:
+                    return answer
+            answer = self.sources[intent][0](entity)
+            # Cached before waiters are released, so later callers hit the cache
+            if answer is not None:
+                self.caches[intent].put(key, answer)
+            return answer
+
+        if not Config.SINGLE_FLIGHT:
+            return load(), False
+        return self.flights.do((intent, key), load, group=intent)
+
+    def configure_caches(self, ttls):
+        """Apply ANSWER_CACHE_SIZE and new per-intent TTLs to the live caches"""
+        for intent, ttl in ttls.items():
+            self.caches[intent].reconfigure(Config.ANSWER_CACHE_SIZE, ttl)
+
+    def start(self):
+        threading.Thread(target=self._run, name="prefetch", daemon=True).start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while True:
+            try:
+                self.prefetch()
+                self.history.forget(time.time() - Config.USAGE_HISTORY_DAYS * 24 * 60 * 60)
+                logger.info(self.summary())
+            except Exception as e:
+                logger.error(f"Prefetch error: {e}")
+            if self._stop_event.wait(Config.PREFETCH_INTERVAL):
+                break
+
+    def _spend(self):
+        """Take one request from the hourly budget, if any is left"""
+        now = self.clock()
+        while self._spent and now - self._spent[0] >= 60 * 60:
+            self._spent.popleft()
+        if len(self._spent) >= Config.PREFETCH_BUDGET:
+            return False
+        self._spent.append(now)
+        return True
+
+    def prefetch(self, when=None):
+        """Warm the caches for the likeliest upcoming requests; returns how many were fetched"""
+        if not self.history:
+            return 0
+        self._forget_expired()
+
+        fetched = 0
+        for intent, entity, uses in self.history.likely(self.sources, when):
+            key = cache_key(entity)
+            with self._lock:
+                if (intent, key) in self._prefetched:
+                    continue  # warmed earlier and not asked for yet
+            # Still fresh at the next pass: nothing to do until then
+            remaining = self.caches[intent].ttl_remaining(key)
+            if remaining is not None and remaining > Config.PREFETCH_INTERVAL:
+                continue
+            if not self._spend():
+                logger.info("Prefetch budget for this hour is used up")
+                break
+            try:
+                answer, shared = self._load(intent, key, entity or None, refresh=True)
+            except Exception as e:
+                logger.info(f"Prefetch of {intent} '{entity}' failed: {e}")
+                continue
+            if answer is None or shared:
+                continue
+            with self._lock:
+                self.stats[intent]["prefetched"] += 1
+                self._prefetched.add((intent, key))
+            fetched += 1
+        return fetched
+
+    def _forget_expired(self):
+        """Prefetched entries that expired or were evicted before anyone asked count as wasted"""
+        with self._lock:
+            for intent, key in list(self._prefetched):
+                if key not in self.caches[intent]:
+                    self._prefetched.discard((intent, key))
+                    self.stats[intent]["wasted"] += 1
+
+    def summary(self):
+        totals = sum(self.stats.values(), Counter())
+        return (f"Prefetch: {totals['prefetched']} prefetched, {rate(totals['prefetch_hits'], totals['prefetched'])} "
+                f"used; {rate(totals['hits'], totals['requests'])} of {totals['requests']} requests from cache")
+
+    def report(self):
+        """Per-integration cache and prefetch hit rates"""
+        with self._lock:
+            lines = [f"Prefetch budget: {len(self._spent)} of {Config.PREFETCH_BUDGET} requests used this hour"]
+            for intent, stats in sorted(self.stats.items()):
+                lines.append(
+                    f"  {intent}: {stats['requests']} requests, {rate(stats['hits'], stats['requests'])} from cache, "
+                    f"{rate(stats['prefetch_hits'], stats['requests'])} thanks to prefetch; "
+                    f"{stats['prefetched']} prefetched, {rate(stats['prefetch_hits'], stats['prefetched'])} used, "
+                    f"{stats['wasted']} expired unused; "
+                    f"{self.flights.coalesced[intent]} of {self.flights.calls[intent]} lookups joined one in flight"
+                )
+        return "\n".join(lines)
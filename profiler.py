@@ -0,0 +1,167 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Innermost Python frames of threads parked on a lock, queue or idle pool;
+# sampling them would bury the turn's real work under idle time
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("selectors.py", "select"),
+    ("socketserver.py", "serve_forever"),
+}
+
+
+def format_stacks(samples):
+    """Collapsed-stack lines ("thread;outer;inner count") for flamegraph.pl, speedscope or inferno"""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(samples.items()))
+
+
+class SamplingProfiler:
+    """Sample every thread's stack at a fixed rate and group the samples by voice turn
+
+    Sampling walks frames from sys._current_frames() in a background thread,
+    so nothing is instrumented and the cost is paid PROFILE_SAMPLE_RATE times
+    a second rather than on every call. Turns whose reply comes more than
+    PROFILE_SLOW_TURN after the command was captured are written to
+    PROFILE_DIR as collapsed stacks.
+    """
+
+    def __init__(self, rate=None, directory=None):
+        self.interval = 1.0 / (rate or Config.PROFILE_SAMPLE_RATE)
+        self.directory = directory or Config.PROFILE_DIR
+        self.session = Counter()
+        self.samples_taken = 0
+        self.sampling_time = 0.0
+        self.slow_turns = 0
+        self._turn = None  # (label, started_at, Counter) while a turn is running
+        self._labels = {}  # code object -> frame label, so each function is formatted once
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"🔬 Profiling at {1 / self.interval:.0f} Hz, turns over "
+                    f"{Config.PROFILE_SLOW_TURN:.1f} s are saved to {self.directory}")
+
+    def stop(self):
+        """Stop sampling and write the whole-session profile; returns its path"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        path = self._write("session", self.session)
+        logger.info(f"🔬 {self.samples_taken} samples, {self.overhead() * 100:.2f}% of one core spent sampling, "
+                    f"{self.slow_turns} slow turns saved; session profile in {path}")
+        return path
+
+    def overhead(self):
+        """Fraction of wall time spent taking samples"""
+        elapsed = self.samples_taken * self.interval
+        return self.sampling_time / elapsed if elapsed else 0.0
+
+    def _run(self):
+        own = threading.get_ident()
+        next_sample = time.perf_counter()
+        while not self._stop_event.is_set():
+            started = time.perf_counter()
+            self.sample(skip=own)
+            self.sampling_time += time.perf_counter() - started
+            next_sample += self.interval
+            delay = next_sample - time.perf_counter()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            else:
+                # Fell behind (e.g. a long GIL hold); skip missed samples instead of bursting
+                next_sample = time.perf_counter()
+
+    def sample(self, skip=None):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            code = frame.f_code
+            if not Config.PROFILE_IDLE_THREADS and (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(self._label(frame.f_code))
+                frame = frame.f_back
+            frames.append(names.get(ident, f"thread-{ident}"))
+            stacks.append(";".join(reversed(frames)))
+
+        with self._lock:
+            self.samples_taken += 1
+            self.session.update(stacks)
+            if self._turn:
+                self._turn[2].update(stacks)
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            path = code.co_filename.replace("\\", "/").split("/")
+            location = "/".join(path[-2:])
+            label = self._labels[code] = f"{code.co_name} ({location}:{code.co_firstlineno})".replace(";", ",")
+        return label
+
+    def begin_turn(self, label):
+        """Start collecting samples for a turn; its latency runs from here until label_turn()"""
+        with self._lock:
+            self._turn = (label, time.perf_counter(), Counter())
+
+    def label_turn(self, label):
+        """Name the running turn once its command is captured, and measure latency from now
+
+        Samples taken earlier (the acknowledgement, the user speaking) stay in
+        the turn's profile but don't count toward PROFILE_SLOW_TURN.
+        """
+        with self._lock:
+            if self._turn:
+                self._turn = (label, time.perf_counter(), self._turn[2])
+
+    def end_turn(self):
+        """Close the current turn; returns its latency in seconds"""
+        with self._lock:
+            turn, self._turn = self._turn, None
+        if turn is None:
+            return None
+        label, started_at, samples = turn
+        elapsed = time.perf_counter() - started_at
+        if elapsed >= Config.PROFILE_SLOW_TURN or Config.PROFILE_ALL_TURNS:
+            self.slow_turns += elapsed >= Config.PROFILE_SLOW_TURN
+            name = "turn-" + "-".join(label.lower().split()[:6])
+            path = self._write(f"{name}-{elapsed * 1000:.0f}ms", samples)
+            if elapsed >= Config.PROFILE_SLOW_TURN:
+                logger.warning(f"🐢 Slow turn ({elapsed:.1f} s after capture) for '{label}': profile in {path}")
+        return elapsed
+
+    def _write(self, name, samples):
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+        path = os.path.join(self.directory, f"{stamp}-{safe_name}.folded")
+        with open(path, "w", encoding="utf-8") as profile_file:
+            profile_file.write(format_stacks(samples))
+        self._prune()
+        return path
+
+    def _prune(self):
+        """Keep at most PROFILE_MAX_FILES profiles, dropping the oldest"""
+        paths = sorted(
+            (os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".folded")),
+            key=os.path.getmtime
+        )
+        for path in paths[:-Config.PROFILE_MAX_FILES or None]:
+            os.remove(path)
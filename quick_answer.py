@@ -0,0 +1,165 @@
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from itertools import islice
+
+from googlesearch import search
+
+from config import Config
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query):
+    """Collapse case, punctuation and spacing so equivalent queries share a cache entry"""
+    query = re.sub(r"[^\w\s]", " ", query.lower())
+    return " ".join(query.split())
+
+
+def shorten(text, max_chars=None):
+    """Trim text to whole sentences that fit in max_chars"""
+    max_chars = max_chars or Config.QUICK_ANSWER_MAX_CHARS
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    sentences = re.split(r"(?<=[.!?])\s+", text)
+    snippet = ""
+    for sentence in sentences:
+        if len(snippet) + len(sentence) + 1 > max_chars:
+            break
+        snippet = f"{snippet} {sentence}".strip()
+    return snippet or text[:max_chars].rsplit(" ", 1)[0] + "..."
+
+
+class SnippetParser(HTMLParser):
+    """Pull the meta description, or failing that the first real paragraph, out of a page"""
+
+    def __init__(self):
+        super().__init__()
+        self.description = None
+        self.paragraph = None
+        self._in_paragraph = False
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "meta" and not self.description:
+            name = (attrs.get("name") or attrs.get("property") or "").lower()
+            if name in ("description", "og:description") and attrs.get("content"):
+                self.description = attrs["content"]
+        elif tag == "p" and self.paragraph is None:
+            self._in_paragraph = True
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag == "p" and self._in_paragraph:
+            self._in_paragraph = False
+            text = " ".join("".join(self._text).split())
+            if len(text) >= Config.QUICK_ANSWER_MIN_CHARS:
+                self.paragraph = text
+
+    def handle_data(self, data):
+        if self._in_paragraph:
+            self._text.append(data)
+
+    @property
+    def snippet(self):
+        return self.description or self.paragraph
+
+
+class QuickAnswerService:
+    """Look up a short answer for a search in the background and report it when ready"""
+
+    def __init__(self, http, on_answer, search_results=None):
+        self.http = http
+        self.on_answer = on_answer
+        self.search_results = search_results or self.default_search_results
+        self.cache = TTLCache(Config.QUICK_ANSWER_CACHE_SIZE, Config.QUICK_ANSWER_CACHE_TTL)
+        self.executor = ThreadPoolExecutor(
+            max_workers=Config.QUICK_ANSWER_WORKERS, thread_name_prefix="quick-answer"
+        )
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    def request(self, query):
+        """Queue a lookup for query; never blocks the caller"""
+        key = normalize_query(query)
+        if not key:
+            return
+
+        snippet = self.cache.get(key)
+        if snippet is not None:
+            self.on_answer(query, snippet)
+            return
+
+        with self._lock:
+            if key in self._in_flight:
+                return
+            if len(self._in_flight) >= Config.QUICK_ANSWER_MAX_PENDING:
+                logger.info(f"Quick answer skipped for '{query}', too many lookups pending")
+                return
+            self._in_flight.add(key)
+        self.executor.submit(self._lookup, query, key)
+
+    def _lookup(self, query, key):
+        try:
+            if self._stopped:
+                return  # queued before shutdown(); the replacement service takes new lookups
+            snippet = self.find_snippet(query)
+            if snippet:
+                self.cache.put(key, snippet)
+                self.on_answer(query, snippet)
+        except Exception as e:
+            logger.info(f"Quick answer lookup failed for '{query}': {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+    def find_snippet(self, query):
+        """Return a short spoken-length answer for query, or None"""
+        for url, snippet in self.search_results(query):
+            logger.info(f"Top result: {url}")
+            if snippet:
+                return shorten(snippet)
+            parser = SnippetParser()
+            parser.feed(self.read_page(url))
+            if parser.snippet:
+                return shorten(parser.snippet)
+        return None
+
+    def read_page(self, url):
+        """The first QUICK_ANSWER_MAX_PAGE_BYTES of a page, without downloading the rest"""
+        with self.http.get(url, timeout=Config.QUICK_ANSWER_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            content = b""
+            for chunk in response.iter_content(chunk_size=16384):
+                content += chunk
+                if len(content) >= Config.QUICK_ANSWER_MAX_PAGE_BYTES:
+                    break
+            encoding = response.encoding or "utf-8"
+        return content[:Config.QUICK_ANSWER_MAX_PAGE_BYTES].decode(encoding, errors="replace")
+
+    def default_search_results(self, query):
+        """Top results as (url, snippet-or-None) pairs from the configured search backend"""
+        if Config.QUICK_ANSWER_SEARCH_URL:
+            # SearxNG-style JSON API: {"results": [{"url": ..., "content": ...}]}
+            response = self.http.get(
+                Config.QUICK_ANSWER_SEARCH_URL,
+                params={'q': query, 'format': 'json'},
+                timeout=Config.QUICK_ANSWER_TIMEOUT
+            )
+            response.raise_for_status()
+            results = response.json().get('results', [])
+            return [(result['url'], result.get('content')) for result in results[:1]]
+
+        results = search(query, num_results=1, advanced=True, timeout=Config.QUICK_ANSWER_TIMEOUT)
+        return [(result.url, result.description) for result in islice(results, 1)]
+
+    def shutdown(self):
+        # cancel_futures needs Python 3.9, so queued lookups check _stopped instead
+        self._stopped = True
+        self.executor.shutdown(wait=False)
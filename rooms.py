@@ -0,0 +1,178 @@
+import logging
+import queue
+import threading
+import time
+from collections import namedtuple
+
+import speech_recognition as sr
+
+from config import Config
+from audio_processing import rms_level
+
+logger = logging.getLogger(__name__)
+
+# A phrase captured in one room, not yet recognized. `level` is the phrase
+# loudness relative to that room's calibrated noise floor, so rooms with
+# different mic gains compare fairly; `captured_at` is when capture ended.
+Capture = namedtuple('Capture', ['room', 'audio', 'level', 'captured_at'])
+
+# The recognized phrase of the room that won arbitration
+Utterance = namedtuple('Utterance', ['room', 'text', 'level', 'captured_at'])
+
+
+class CapturePipeline(threading.Thread):
+    """Continuous capture for one input device; recognition is left to PhraseArbiter"""
+
+    def __init__(self, room, microphone, output, recognizer=None, echo_guard=None, reopen=None):
+        super().__init__(name=f"capture-{room}", daemon=True)
+        self.room = room
+        self.microphone = microphone
+        self.output = output
+        self.recognizer = recognizer or sr.Recognizer()
+        self.echo_guard = echo_guard
+        self.reopen = reopen
+        self.noise_floor = None
+        self._stop_event = threading.Event()
+
+    def calibrate(self, duration=None):
+        """Measure this room's ambient noise floor"""
+        with self.microphone as source:
+            self.recognizer.adjust_for_ambient_noise(
+                source, duration=duration or Config.AMBIENT_NOISE_DURATION
+            )
+        # Remember the calibrated floor: energy_threshold keeps drifting with
+        # dynamic adjustment and rises fastest in the loudest room
+        self.noise_floor = max(self.recognizer.energy_threshold, 1.0) / 32768.0
+        logger.info(f"Room '{self.room}' calibrated, energy threshold {self.recognizer.energy_threshold:.0f}")
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                # Keep the stream open for the lifetime of the pipeline instead of
+                # reopening the device for every phrase
+                with self.microphone as source:
+                    while not self._stop_event.is_set():
+                        self.capture_once(source)
+            except OSError as e:
+                logger.error(f"Room '{self.room}' device error: {e}")
+                self.recover()
+
+    def recover(self):
+        """Reopen the room's device, keeping the existing noise calibration"""
+        microphone = self.reopen(self.room) if self.reopen else None
+        if microphone is None:
+            self._stop_event.wait(Config.AUDIO_DEVICE_RETRY_INTERVAL)
+            return
+        self.microphone = microphone
+        logger.info(f"Room '{self.room}' reopened its device, calibration kept")
+
+    def capture_once(self, source):
+        """Capture a single phrase and queue it for arbitration"""
+        started_at = time.monotonic()
+        try:
+            audio = self.recognizer.listen(
+                source,
+                timeout=Config.ROOM_LISTEN_TIMEOUT,
+                phrase_time_limit=Config.PHRASE_TIME_LIMIT
+            )
+        except sr.WaitTimeoutError:
+            return
+        except OSError:
+            raise
+        except Exception as e:
+            logger.error(f"Room '{self.room}' listening error: {e}")
+            time.sleep(1)
+            return
+
+        # Drop phrases that overlapped with the assistant's own speech
+        if self.echo_guard and not self.echo_guard(started_at):
+            return
+
+        captured_at = time.monotonic()
+        noise_floor = self.noise_floor or max(self.recognizer.energy_threshold, 1.0) / 32768.0
+        try:
+            self.output.put_nowait(Capture(self.room, audio, rms_level(audio) / noise_floor, captured_at))
+        except queue.Full:
+            logger.warning(f"Dropping phrase from '{self.room}', arbitration is behind")
+
+
+class PhraseArbiter(threading.Thread):
+    """Pick one room per spoken phrase by loudness, then recognize only that room's audio
+
+    Every room near the speaker captures the same phrase. Captures whose ends
+    fall within ROOM_ARBITRATION_WINDOW of each other count as one phrase,
+    and only the loudest is uploaded for recognition, so the choice does not
+    depend on upload jitter and N rooms cost one upload instead of N. While
+    `focus` names a room (waiting for its command), that room's capture is
+    recognized whenever it heard the phrase at all.
+    """
+
+    def __init__(self, captures, output, recognize=None, preprocessor=None, window=None):
+        super().__init__(name="phrase-arbiter", daemon=True)
+        self.captures = captures
+        self.output = output
+        self.recognize = recognize or sr.Recognizer().recognize_google
+        self.preprocessor = preprocessor
+        self.window = window  # None follows ROOM_ARBITRATION_WINDOW
+        self.focus = None
+        self._held = None  # first capture of the next phrase, taken while collecting this one
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                first = self._next_capture(Config.ROOM_LISTEN_TIMEOUT)
+            except queue.Empty:
+                continue
+            self.recognize_capture(self.arbitrate(first))
+
+    def _next_capture(self, timeout):
+        if self._held:
+            capture, self._held = self._held, None
+            return capture
+        return self.captures.get(timeout=timeout)
+
+    def arbitrate(self, first):
+        """Collect the other rooms' captures of the same phrase and return the one to recognize"""
+        candidates = {first.room: first}
+        deadline = first.captured_at + (Config.ROOM_ARBITRATION_WINDOW if self.window is None else self.window)
+        while True:
+            try:
+                capture = self._next_capture(max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if capture.captured_at > deadline:
+                self._held = capture
+                break
+            current = candidates.get(capture.room)
+            if current is None or capture.level > current.level:
+                candidates[capture.room] = capture
+
+        winner = candidates.get(self.focus) or max(candidates.values(), key=lambda c: c.level)
+        if len(candidates) > 1:
+            heard = ', '.join(f"{c.room}={c.level:.1f}" for c in candidates.values())
+            logger.info(f"Phrase heard in {len(candidates)} rooms ({heard}), recognizing '{winner.room}'")
+        return winner
+
+    def recognize_capture(self, capture):
+        """Recognize one capture and queue it as an Utterance"""
+        audio = self.preprocessor.process(capture.audio) if self.preprocessor else capture.audio
+        try:
+            text = self.recognize(audio).lower()
+        except sr.UnknownValueError:
+            return
+        except sr.RequestError as e:
+            logger.error(f"Room '{capture.room}' speech recognition error: {e}")
+            return
+
+        logger.info(f"Room '{capture.room}' heard: {text} (level {capture.level:.1f})")
+        try:
+            self.output.put_nowait(Utterance(capture.room, text, capture.level, capture.captured_at))
+        except queue.Full:
+            logger.warning(f"Dropping utterance from '{capture.room}', dispatcher is behind")
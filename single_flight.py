@@ -0,0 +1,52 @@
+import threading
+from collections import Counter
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for it and get the same result or exception. Nothing is
+    remembered once the call finishes, so this is no substitute for a cache.
+    """
+
+    def __init__(self):
+        self.calls = Counter()  # per group, see do()
+        self.coalesced = Counter()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function, group=None):
+        """Run function() once per in-flight key; returns (result, shared)
+
+        `group` labels the counters, e.g. the integration name. `shared` is
+        True for callers that got another caller's result.
+        """
+        with self._lock:
+            self.calls[group] += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced[group] += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = function()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+        future.set_result(result)
+        return result, False
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._in_flight)
@@ -0,0 +1,99 @@
+import json
+import logging
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+from config import Config
+
+try:
+    import vosk
+except ImportError:  # optional: pip install vosk, plus a model from https://alphacephei.com/vosk/models
+    vosk = None
+
+logger = logging.getLogger(__name__)
+
+# A command started from a partial result: the PlannedCommand and the Future
+# of its run, (was playing before, keep_running, lines to speak)
+EarlyCommit = namedtuple('EarlyCommit', ['command', 'future'])
+
+
+def available():
+    """True if the local decoder and its model are installed"""
+    if vosk is None:
+        logger.info("Streaming recognition off: vosk is not installed")
+        return False
+    if not os.path.isdir(Config.STREAMING_MODEL):
+        logger.info(f"Streaming recognition off: no model at {Config.STREAMING_MODEL}")
+        return False
+    return True
+
+
+@lru_cache(maxsize=1)
+def load_model(path):
+    """Loading a model takes seconds, so it is done once per process"""
+    vosk.SetLogLevel(-1)
+    return vosk.Model(model_path=path)
+
+
+class VoskDecoder:
+    """Local incremental decoder for one phrase: feed it audio, read the growing transcript"""
+
+    def __init__(self, sample_rate):
+        self._recognizer = vosk.KaldiRecognizer(load_model(Config.STREAMING_MODEL), sample_rate)
+        self._segments = []
+
+    def accept(self, pcm):
+        """Decode 16-bit mono PCM; returns the hypothesis for everything heard so far"""
+        if self._recognizer.AcceptWaveform(pcm):
+            # Vosk found a pause inside the phrase and finalized the words before it
+            self._segments.append(json.loads(self._recognizer.Result()).get("text", ""))
+            partial = ""
+        else:
+            partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+        return " ".join(filter(None, self._segments + [partial]))
+
+    def final(self):
+        self._segments.append(json.loads(self._recognizer.FinalResult()).get("text", ""))
+        return " ".join(filter(None, self._segments))
+
+
+class PartialIntentTracker:
+    """Decide when a partial transcript is settled enough to act on
+
+    Only intents listed in EARLY_COMMIT_INTENTS qualify, since those have an
+    undo, and only when the whole partial transcript is one of
+    EARLY_COMMIT_PHRASES, so the start of a longer request such as "skip
+    this part" never qualifies. It must also have held unchanged for
+    EARLY_COMMIT_STABLE_SECONDS of audio. Time is measured in audio rather
+    than in partial results, whose rate depends on chunk size and sample
+    rate. At most one command is committed per phrase.
+    """
+
+    def __init__(self, extract, phrases):
+        self.extract = extract
+        self.phrases = phrases
+        self.committed = None
+        self._partial = None
+        self._candidate = None
+        self._since = 0.0
+
+    def update(self, partial, at):
+        """Feed the partial transcript after `at` seconds of audio
+
+        Returns (intent, entity) the moment it becomes safe to commit, otherwise None.
+        """
+        if self.committed or not partial:
+            return None
+        if partial != self._partial:
+            self._partial, self._since = partial, at
+            if any(phrase.fullmatch(partial.strip()) for phrase in self.phrases):
+                self._candidate = self.extract(partial)
+            else:
+                self._candidate = (None, None)
+        if self._candidate[0] not in Config.EARLY_COMMIT_INTENTS:
+            return None
+        if at - self._since >= Config.EARLY_COMMIT_STABLE_SECONDS:
+            self.committed = self._candidate
+            return self._candidate
+        return None
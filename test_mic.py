@@ -1,27 +1,23 @@
+import time
 import speech_recognition as sr
+from config import Config
+from audio_processing import AudioPreprocessor
+from audio_devices import AudioDeviceManager
 
 def test_microphone():
     recognizer = sr.Recognizer()
+    devices = AudioDeviceManager()
     
     # List all available microphones
+    started = time.perf_counter()
     print("\nAvailable microphones:")
-    for index, name in enumerate(sr.Microphone.list_microphone_names()):
+    for index, name in enumerate(devices.names()):
         print(f"Microphone {index}: {name}")
     
     try:
-        # Try to use the Microphone Array
-        microphone_index = None
-        for index, name in enumerate(sr.Microphone.list_microphone_names()):
-            if "Microphone Array" in name:
-                microphone_index = index
-                break
-        
-        if microphone_index is None:
-            print("\nNo Microphone Array found, using default microphone...")
-            mic = sr.Microphone()
-        else:
-            print(f"\nUsing Microphone Array (index {microphone_index})...")
-            mic = sr.Microphone(device_index=microphone_index)
+        # Try to use the preferred microphone (the Microphone Array by default)
+        mic, name = devices.open(Config.MICROPHONE_PREFERENCES)
+        print(f"\nUsing {name} (selected in {(time.perf_counter() - started) * 1000:.0f} ms)...")
         
         with mic as source:
             print("Adjusting for ambient noise... Please be quiet.")
@@ -29,9 +25,12 @@ def test_microphone():
             print("\nMicrophone is ready! Please say something...")
             try:
                 audio = recognizer.listen(source, timeout=5)
+                processed = AudioPreprocessor().process(audio)
+                print(f"\nCaptured {len(audio.frame_data)} bytes at {audio.sample_rate} Hz, "
+                      f"uploading {len(processed.frame_data)} bytes at {processed.sample_rate} Hz")
                 print("\nRecognizing your speech...")
                 try:
-                    text = recognizer.recognize_google(audio)
+                    text = recognizer.recognize_google(processed)
                     print(f"\nYou said: {text}")
                 except sr.UnknownValueError:
                     print("\nCould not understand the audio")
@@ -0,0 +1,116 @@
+"""QuickAnswerService against a local stub search endpoint. Run from the project root:
+
+    python -m pytest tests
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from config import Config
+from quick_answer import QuickAnswerService
+
+ANSWER = ("Python is a high-level, general-purpose programming language "
+          "that emphasizes code readability.")
+
+
+class StubSearch(BaseHTTPRequestHandler):
+    """/search answers like SearxNG without a snippet, so the service has to read /page"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        server = self.server
+        if url.path == "/search":
+            server.searches.append(parse_qs(url.query)["q"][0])
+            server.release.wait(5)
+            base = f"http://127.0.0.1:{server.server_port}"
+            self.reply("application/json", json.dumps({"results": [{"url": f"{base}/page", "content": None}]}))
+        elif url.path == "/page":
+            self.reply("text/html; charset=utf-8", server.page)
+        else:
+            self.send_error(404)
+
+    def reply(self, content_type, body):
+        body = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSearch)
+    server.searches = []
+    server.release = threading.Event()
+    server.release.set()
+    server.page = f"<html><head><title>Python</title></head><body><p>Menu</p><p>{ANSWER}</p></body></html>"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(Config, "QUICK_ANSWER_SEARCH_URL", f"http://127.0.0.1:{server.server_port}/search")
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def answers():
+    return []
+
+
+@pytest.fixture
+def service(answers):
+    service = QuickAnswerService(requests.Session(), lambda query, snippet: answers.append((query, snippet)))
+    yield service
+    service.executor.shutdown(wait=True)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def test_snippet_is_extracted_from_the_top_result(stub, service, answers):
+    service.request("What is Python?")
+    wait_for(lambda: answers)
+    assert answers == [("What is Python?", ANSWER)]
+    assert stub.searches == ["What is Python?"]
+
+
+def test_normalized_query_is_answered_from_the_cache(stub, service, answers):
+    service.request("What is Python?")
+    wait_for(lambda: answers)
+    service.request("  what is   PYTHON ")
+    assert answers[1] == ("  what is   PYTHON ", ANSWER)
+    assert len(stub.searches) == 1
+
+
+def test_lookups_beyond_max_pending_are_skipped(stub, service, answers, monkeypatch):
+    monkeypatch.setattr(Config, "QUICK_ANSWER_MAX_PENDING", 2)
+    stub.release.clear()
+    for query in ("first question", "second question", "third question"):
+        service.request(query)
+    wait_for(lambda: len(stub.searches) == min(2, Config.QUICK_ANSWER_WORKERS))
+    stub.release.set()
+    wait_for(lambda: len(answers) == 2)
+    service.executor.shutdown(wait=True)
+    assert sorted(stub.searches) == ["first question", "second question"]
+    assert sorted(query for query, _ in answers) == ["first question", "second question"]
+
+
+def test_page_is_read_only_up_to_the_cap(stub, service, answers, monkeypatch):
+    monkeypatch.setattr(Config, "QUICK_ANSWER_MAX_PAGE_BYTES", 1000)
+    stub.page = "<html><body>" + "<div>filler</div>" * 500 + f"<p>{ANSWER}</p></body></html>"
+    assert service.find_snippet("What is Python?") is None